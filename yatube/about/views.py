@@ -1,9 +1,11 @@
-from django.views.generic.base import TemplateView
+from core.prerender import PrerenderedTemplateView
 
 
-class AboutAuthorView(TemplateView):
+class AboutAuthorView(PrerenderedTemplateView):
     template_name = 'about/author.html'
+    prerender_name = 'about_author'
 
 
-class AboutTechView(TemplateView):
+class AboutTechView(PrerenderedTemplateView):
     template_name = 'about/tech.html'
+    prerender_name = 'about_tech'
@@ -0,0 +1,141 @@
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import ArchivedPost, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='api_user')
+        cls.group = Group.objects.create(title='Группа', slug='api-group')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_index_selects_fields_and_pages_by_cursor(self):
+        """Лента отдаёт только запрошенные поля и листается курсором."""
+        url = reverse('api:index')
+        first = self.guest_client.get(
+            url, {'fields': 'id,author', 'limit': 3}
+        ).json()
+        second = self.guest_client.get(
+            url, {'fields': 'id', 'cursor': first['next_cursor']}
+        ).json()
+
+        self.assertEqual(
+            first['results'][0],
+            {'id': self.posts[4].pk, 'author': 'api_user'},
+        )
+        self.assertEqual(
+            [item['id'] for item in second['results']],
+            [self.posts[1].pk, self.posts[0].pk],
+        )
+        self.assertIsNone(second['next_cursor'])
+
+    def test_cursor_reaches_archived_post_with_high_pk(self):
+        """Архивный пост с pk больше горячих не теряется при листании."""
+        archived = ArchivedPost.objects.create(
+            pk=self.posts[-1].pk + 100,
+            author=self.user,
+            text='Старый пост с большим id',
+            pub_date=datetime(2000, 1, 1, tzinfo=timezone.utc),
+        )
+        url = reverse('api:index')
+        ids = []
+        params = {'fields': 'id', 'limit': 2}
+        while True:
+            page = self.guest_client.get(url, params).json()
+            ids += [item['id'] for item in page['results']]
+            if page['next_cursor'] is None:
+                break
+            params['cursor'] = page['next_cursor']
+
+        self.assertEqual(
+            ids, [post.pk for post in reversed(self.posts)] + [archived.pk]
+        )
+
+    def test_malformed_cursor_rejected(self):
+        """Курсор не вида pub_date|pk даёт ошибку 400."""
+        response = self.guest_client.get(
+            reverse('api:index'), {'cursor': '42'}
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_unknown_field_rejected(self):
+        """Неизвестное поле в fields даёт ошибку 400."""
+        response = self.guest_client.get(
+            reverse('api:index'), {'fields': 'id,password'}
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_cached_feed_invalidated_by_new_post(self):
+        """Новый пост сразу появляется в закэшированной ленте группы."""
+        url = reverse('api:group_posts', kwargs={'slug': self.group.slug})
+        self.guest_client.get(url)
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Свежий пост'
+        )
+
+        response = self.guest_client.get(url).json()
+
+        self.assertEqual(response['results'][0]['id'], post.pk)
+
+    def test_follow_feed_requires_auth(self):
+        """Лента подписок недоступна анониму."""
+        response = self.guest_client.get(reverse('api:follow_posts'))
+
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_follow_feed_not_shared_between_users(self):
+        """Лента подписок одного пользователя не отдаётся другому."""
+        author = User.objects.create_user(username='other_author')
+        Post.objects.create(author=author, text='Пост другого автора')
+        reader = User.objects.create_user(username='reader')
+        other_reader = User.objects.create_user(username='other_reader')
+        Follow.objects.create(user=reader, author=self.user)
+        Follow.objects.create(user=other_reader, author=author)
+        url = reverse('api:follow_posts')
+        results = {}
+        for user in (reader, other_reader):
+            client = Client()
+            client.force_login(user)
+            results[user.username] = {
+                post['author'] for post in client.get(url).json()['results']
+            }
+
+        self.assertEqual(results['reader'], {'api_user'})
+        self.assertEqual(results['other_reader'], {'other_author'})
+
+    def test_post_detail(self):
+        """Пост отдаётся по id, несуществующий — 404."""
+        post = self.posts[0]
+        response = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': post.pk}),
+            {'fields': 'text,group'},
+        )
+        missing = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': 0})
+        )
+
+        self.assertEqual(
+            response.json(), {'text': 'Пост 0', 'group': 'api-group'}
+        )
+        self.assertEqual(missing.status_code, HTTPStatus.NOT_FOUND)
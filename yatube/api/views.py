@@ -0,0 +1,191 @@
+import hashlib
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+
+from posts.cache import get_versions
+from posts.models import ArchivedPost, Post
+from posts.utils import parse_cursor, resolve_author, resolve_group
+
+# Поле ответа -> поле для values()
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def error(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def parse_fields(request):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(FIELDS)
+    fields = requested.split(',')
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise ApiError(
+            'Неизвестные поля: {}'.format(', '.join(sorted(unknown)))
+        )
+    return fields
+
+
+def parse_limit(request):
+    limit = parse_cursor(request.GET.get('limit')) or settings.LIMIT_POSTS
+    return min(max(limit, 1), settings.API_MAX_LIMIT)
+
+
+def parse_feed_cursor(value):
+    """Разбирает курсор ленты вида 'pub_date|pk'; None — первая страница."""
+    if not value:
+        return None
+    pub_date, _, pk = value.rpartition('|')
+    try:
+        # '+' смещения часового пояса в неэкранированном адресе — пробел.
+        pub_date = parse_datetime(pub_date.replace(' ', '+'))
+        pk = int(pk)
+    except ValueError:
+        pub_date = None
+    if pub_date is None:
+        raise ApiError('Неверный курсор')
+    return pub_date, pk
+
+
+def serialize(row, fields):
+    item = {field: row[FIELDS[field]] for field in fields}
+    if 'image' in item:
+        item['image'] = (
+            settings.MEDIA_URL + item['image'] if item['image'] else None
+        )
+    return item
+
+
+def read_feed(hot, archive, fields, cursor, limit):
+    """Страница ленты по курсору: сначала горячие посты, затем архив.
+
+    Таблицы разделены по pub_date, поэтому ключ страницы — пара
+    (pub_date, pk), и порядок совпадает с HTML-лентами.
+    """
+    columns = {FIELDS[field] for field in fields} | {'id', 'pub_date'}
+    rows = []
+    for queryset in (hot, archive):
+        if cursor is not None:
+            pub_date, pk = cursor
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        rows += queryset.order_by('-pub_date', '-pk').values(*columns)[
+            :limit + 1 - len(rows)
+        ]
+        if len(rows) > limit:
+            break
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = '{}|{}'.format(last['pub_date'].isoformat(), last['id'])
+    return {
+        'results': [serialize(row, fields) for row in rows[:limit]],
+        'next_cursor': next_cursor,
+    }
+
+
+def cached_json(request, feeds, build):
+    """Отдаёт ответ из кэша, пока не изменилась ни одна из лент feeds."""
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    key = 'api:{}:{}'.format(get_versions(*feeds), path)
+    payload = cache.get(key)
+    if payload is None:
+        try:
+            payload = build()
+        except ApiError as exc:
+            return error(str(exc), exc.status)
+        cache.set(key, payload, settings.API_CACHE_TIMEOUT)
+    return JsonResponse(payload)
+
+
+def feed_response(request, hot, archive, feeds):
+    def build():
+        return read_feed(
+            hot,
+            archive,
+            parse_fields(request),
+            parse_feed_cursor(request.GET.get('cursor')),
+            parse_limit(request),
+        )
+    return cached_json(request, feeds + ['archive'], build)
+
+
+@require_GET
+def index(request):
+    return feed_response(
+        request, Post.objects.all(), ArchivedPost.objects.all(), ['posts']
+    )
+
+
+@require_GET
+def group_posts(request, slug):
+    group = resolve_group(slug)
+    if group is None:
+        return error('Группа не найдена', HTTPStatus.NOT_FOUND)
+    return feed_response(
+        request,
+        group.posts.all(),
+        group.archived_posts.all(),
+        [f'group:{group.pk}'],
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    author = resolve_author(username)
+    if author is None:
+        return error('Пользователь не найден', HTTPStatus.NOT_FOUND)
+    return feed_response(
+        request,
+        author.posts.all(),
+        author.archived_posts.all(),
+        [f'author:{author.pk}'],
+    )
+
+
+@require_GET
+def follow_posts(request):
+    user = request.user
+    if not user.is_authenticated:
+        return error('Требуется авторизация', HTTPStatus.UNAUTHORIZED)
+    return feed_response(
+        request,
+        Post.objects.filter(author__following__user=user),
+        ArchivedPost.objects.filter(author__following__user=user),
+        ['posts', f'follow:{user.pk}'],
+    )
+
+
+@require_GET
+def post_detail(request, post_id):
+    def build():
+        fields = parse_fields(request)
+        columns = {FIELDS[field] for field in fields}
+        for model in (Post, ArchivedPost):
+            row = model.objects.filter(pk=post_id).values(*columns).first()
+            if row is not None:
+                return serialize(row, fields)
+        raise ApiError('Пост не найден', HTTPStatus.NOT_FOUND)
+
+    return cached_json(request, [f'post:{post_id}', 'archive'], build)
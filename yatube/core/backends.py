@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+USER_CACHE_KEY = 'core:user:{}'
+
+# Поля, которые в кэш не попадают.
+UNCACHED_FIELDS = {'password'}
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кэша.
+
+    В общий кэш кладутся поля пользователя без хэша пароля. Пароль
+    собранного из кэша пользователя остаётся отложенным полем: его
+    одним запросом дочитывает проверка сессии. Хэш сессии не кэшируется,
+    иначе после смены пароля update_session_auth_hash() записал бы в
+    сессию старый хэш и пользователя выбросило бы из системы.
+
+    Запись сбрасывается сигналами из core.signals при любом сохранении
+    или удалении пользователя, в том числе при смене пароля и входе.
+    """
+    def get_user(self, user_id):
+        key = USER_CACHE_KEY.format(user_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return self.restore(cached)
+        user = super().get_user(user_id)
+        if user is not None:
+            fields = {
+                field.attname: getattr(user, field.attname)
+                for field in user._meta.concrete_fields
+                if field.name not in UNCACHED_FIELDS
+            }
+            cache.set(key, fields, settings.USER_CACHE_TIMEOUT)
+        return user
+
+    @staticmethod
+    def restore(fields):
+        return get_user_model().from_db(
+            DEFAULT_DB_ALIAS, list(fields), list(fields.values())
+        )
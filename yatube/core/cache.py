@@ -0,0 +1,249 @@
+"""Двухуровневый кэш: LRU в памяти процесса перед общим кэшем.
+
+Первый уровень — небольшой словарь в памяти воркера с ограниченным
+числом записей и коротким сроком жизни. Второй — общий для всех
+воркеров кэш из CACHES (алиас в OPTIONS['SHARED']).
+
+Запись и удаление идут в оба уровня и публикуются в журнал
+инвалидаций во втором уровне: счётчик tiered:seq и ключи
+tiered:invalidation:<номер> со списком изменённых ключей. Остальные
+воркеры не чаще раза в SYNC_INTERVAL секунд читают журнал и
+выбрасывают эти ключи из памяти. Если журнал потерян или очищен,
+первый уровень очищается целиком.
+
+Настройки в OPTIONS:
+    SHARED — алиас общего кэша, по умолчанию 'shared';
+    LOCAL_MAX_ENTRIES — размер LRU в памяти, по умолчанию 1000;
+    LOCAL_TIMEOUT — сколько секунд запись живёт в памяти, по умолчанию 5;
+    SYNC_INTERVAL — как часто читать журнал, по умолчанию 1 секунда.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+from .tracing import traced
+
+SEQ_KEY = 'tiered:seq'
+INVALIDATION_KEY = 'tiered:invalidation:{}'
+# Запись журнала должна пережить интервал синхронизации с запасом.
+INVALIDATION_TIMEOUT = 60
+
+MISSING = object()
+
+
+class LocalTier:
+    """Память процесса для одного LOCATION.
+
+    Как и у LocMemCache, общая для всех экземпляров бэкенда в процессе:
+    Django создаёт их по одному на поток, а cache_page держит свой.
+    """
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.seen = None
+        self.synced_at = 0
+        self.stats = dict.fromkeys(
+            ('local_hits', 'local_misses', 'shared_hits', 'shared_misses'),
+            0,
+        )
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        options = params.get('OPTIONS', {})
+        super().__init__(params)
+        self._shared_alias = options.get('SHARED', 'shared')
+        self._local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self._sync_interval = float(options.get('SYNC_INTERVAL', 1))
+        with _tiers_lock:
+            self._tier = _tiers.setdefault(location, LocalTier())
+        self._local = self._tier.entries
+        self._lock = self._tier.lock
+        self._stats = self._tier.stats
+
+    @cached_property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def stats(self):
+        """Попадания и промахи по уровням в этом процессе."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+        return stats
+
+    # Первый уровень
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._local.move_to_end(key)
+                self._stats['local_hits'] += 1
+                return pickle.loads(entry[1])
+            if entry is not None:
+                del self._local[key]
+            self._stats['local_misses'] += 1
+        return MISSING
+
+    def _local_set(self, key, value, timeout):
+        ttl = self._local_timeout
+        if timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_forget([key])
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, pickled)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_forget(self, keys):
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    # Журнал инвалидаций
+
+    def _publish(self, keys):
+        try:
+            seq = self.shared.incr(SEQ_KEY)
+        except ValueError:
+            # Счётчик начинается со времени, чтобы после очистки общего
+            # кэша новые номера не совпали с уже прочитанными.
+            self.shared.add(SEQ_KEY, int(time.time() * 1000), None)
+            seq = self.shared.incr(SEQ_KEY)
+        self.shared.set(
+            INVALIDATION_KEY.format(seq), list(keys), INVALIDATION_TIMEOUT
+        )
+
+    def _sync(self):
+        tier = self._tier
+        now = time.monotonic()
+        if now - tier.synced_at < self._sync_interval:
+            return
+        tier.synced_at = now
+        seq = self.shared.get(SEQ_KEY, 0)
+        seen, tier.seen = tier.seen, seq
+        if seen is None or seq == seen:
+            return
+        if seq < seen or seq - seen > self._local_max_entries:
+            # Общий кэш очистили или журнал слишком отстал.
+            self._local_clear()
+            return
+        names = [INVALIDATION_KEY.format(n) for n in range(seen + 1, seq + 1)]
+        found = self.shared.get_many(names)
+        if len(found) < len(names):
+            # Часть журнала истекла: безопаснее забыть всё.
+            self._local_clear()
+            return
+        self._local_forget(key for keys in found.values() for key in keys)
+
+    def _local_clear(self):
+        with self._lock:
+            self._local.clear()
+
+    # Интерфейс кэша
+
+    def _local_timeout_for(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return timeout
+
+    @traced('cache.get')
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        self._sync()
+        value = self._local_get(local_key)
+        if value is not MISSING:
+            return value
+
+        value = self.shared.get(key, MISSING, version=version)
+        with self._lock:
+            self._stats[
+                'shared_misses' if value is MISSING else 'shared_hits'
+            ] += 1
+        if value is MISSING:
+            return default
+        self._local_set(local_key, value, None)
+        return value
+
+    @traced('cache.set')
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        self.shared.set(key, value, timeout, version=version)
+        self._local_set(local_key, value, self._local_timeout_for(timeout))
+        self._publish([local_key])
+
+    @traced('cache.set_many')
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        local_keys = []
+        for key, value in data.items():
+            local_key = self.make_key(key, version)
+            local_keys.append(local_key)
+            if key not in failed:
+                self._local_set(
+                    local_key, value, self._local_timeout_for(timeout)
+                )
+        self._publish(local_keys)
+        return failed
+
+    @traced('cache.add')
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        # Отсутствующие ключи в памяти не хранятся, публиковать нечего.
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._local_set(
+                local_key, value, self._local_timeout_for(timeout)
+            )
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    @traced('cache.delete')
+    def delete(self, key, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        self.shared.delete(key, version=version)
+        self._local_forget([local_key])
+        self._publish([local_key])
+
+    @traced('cache.delete_many')
+    def delete_many(self, keys, version=None):
+        local_keys = [self.make_key(key, version) for key in keys]
+        self.shared.delete_many(keys, version=version)
+        self._local_forget(local_keys)
+        self._publish(local_keys)
+
+    @traced('cache.incr')
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        value = self.shared.incr(key, delta, version=version)
+        # Срок жизни в общем кэше не меняется, в памяти — обычный.
+        self._local_set(local_key, value, None)
+        self._publish([local_key])
+        return value
+
+    def clear(self):
+        self.shared.clear()
+        self._local_clear()
+        self._tier.seen = None
@@ -1,8 +1,11 @@
 import datetime as dt
 
+from core.timing import lazy_processor
 
+
+@lazy_processor
 def year(request):
     """Добавляет переменную с текущим годом."""
     return {
-        'year': dt.datetime.now().year
+        'year': lambda: dt.datetime.now().year
     }
@@ -0,0 +1,79 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def fetch(host, port, path):
+    """Один GET в новом соединении: время ответа или None при ошибке."""
+    started = time.perf_counter()
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+    except OSError:
+        return None
+    if response.status >= 500:
+        return None
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: GET-запросы к адресу в несколько потоков, '
+        'выводит запросы в секунду и перцентили задержки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        path = f'{url.path or "/"}?{url.query}' if url.query else (
+            url.path or '/'
+        )
+        remaining = iter(range(options['requests']))
+        lock = threading.Lock()
+        results = []
+
+        def client():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                result = fetch(url.hostname, url.port or 80, path)
+                with lock:
+                    results.append(result)
+
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=client)
+            for _ in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report(results, time.perf_counter() - started)
+
+    def report(self, results, elapsed):
+        latencies = sorted(result for result in results if result is not None)
+        self.stdout.write(
+            f'Запросов: {len(latencies)}, '
+            f'ошибок: {len(results) - len(latencies)}, за {elapsed:.2f} с'
+        )
+        self.stdout.write(f'В секунду: {len(latencies) / elapsed:.1f}')
+        for percent in (50, 95, 99):
+            if latencies:
+                index = min(
+                    len(latencies) - 1, len(latencies) * percent // 100
+                )
+                self.stdout.write(
+                    f'p{percent}: {latencies[index] * 1000:.1f} мс'
+                )
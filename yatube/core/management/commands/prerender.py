@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.prerender import build
+
+
+class Command(BaseCommand):
+    help = (
+        'Рендерит страницы about и страницы ошибок в PRERENDER_ROOT. '
+        'Запускать при каждой выкладке после collectstatic.'
+    )
+
+    def handle(self, *args, **options):
+        built = build()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово страниц: {len(built)}'
+        ))
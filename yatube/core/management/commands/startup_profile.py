@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.startup import by_package, profile
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает WSGI-воркер в отдельном процессе и показывает время '
+        'этапов запуска, ready() приложений и импорта модулей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Сколько самых долгих модулей и пакетов показать',
+        )
+        parser.add_argument(
+            '--target', default=settings.SETTINGS_MODULE,
+            help='Модуль настроек воркера, по умолчанию текущий',
+        )
+
+    def handle(self, *args, **options):
+        report = profile(options['target'], settings.BASE_DIR)
+        limit = options['limit']
+        self.line('Запуск воркера', report['total'])
+        for phase, seconds in report['phases'].items():
+            self.line(f'  {phase}', seconds)
+
+        self.stdout.write('\nready() приложений:')
+        for label, seconds in sorted(
+            report['ready'].items(), key=lambda item: item[1], reverse=True
+        ):
+            self.line(f'  {label}', seconds)
+
+        self.stdout.write('\nИмпорт по пакетам (собственное время):')
+        for package, seconds in by_package(report['imports'])[:limit]:
+            self.line(f'  {package}', seconds)
+
+        self.stdout.write('\nСамые долгие модули (собственное время):')
+        modules = sorted(
+            report['imports'], key=lambda item: item[1], reverse=True
+        )
+        for module, self_time, _ in modules[:limit]:
+            self.line(f'  {module}', self_time)
+
+    def line(self, name, seconds):
+        self.stdout.write(f'{name:<50} {seconds * 1000:9.1f} мс')
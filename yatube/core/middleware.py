@@ -0,0 +1,129 @@
+import logging
+import random
+import threading
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import profiling, slow_queries, timing, tracing
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """Отдаёт время контекст-процессоров запроса в Server-Timing."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing.start_request()
+        response = self.get_response(request)
+        timings = timing.finish_request()
+        if timings:
+            logger.debug('%s %s', request.path, timings)
+            if settings.SERVER_TIMING:
+                response['Server-Timing'] = ', '.join(
+                    f'{name};dur={ms:.3f}' for name, ms in timings.items()
+                )
+        return response
+
+
+class ProfilerMiddleware:
+    """Профилирует долю PROFILER_SAMPLE_RATE запросов.
+
+    По умолчанию доля нулевая и middleware ничего не делает.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PROFILER_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+        sampler = profiling.Sampler(thread_ids={threading.get_ident()})
+        sampler.start()
+        try:
+            return self.get_response(request)
+        finally:
+            profiling.add_request_stacks(sampler.stop())
+
+
+class SlowQueryMiddleware:
+    """Пишет в журнал запросы дольше SLOW_QUERY_THRESHOLD мс."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.SLOW_QUERY_THRESHOLD is None:
+            return self.get_response(request)
+        wrapper = slow_queries.SlowQueryWrapper(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return self.get_response(request)
+
+
+class TracingMiddleware:
+    """Трассирует долю TRACING_SAMPLE_RATE запросов.
+
+    Персонал может запросить трассу заголовком X-Trace: 1. Спан view
+    открывается в process_view и закрывается после ответа или в
+    process_exception; стоит последним в MIDDLEWARE, чтобы в спан не
+    попадали process_view остальных middleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def sampled(self, request):
+        if request.META.get('HTTP_X_TRACE') == '1':
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_staff:
+                return True
+        rate = settings.TRACING_SAMPLE_RATE
+        return bool(rate) and random.random() < rate
+
+    def __call__(self, request):
+        if not self.sampled(request):
+            return self.get_response(request)
+        tracing.start_trace()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(tracing.span(
+                    'http.request', method=request.method, path=request.path
+                ))
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(tracing.db_wrapper)
+                    )
+                try:
+                    response = self.get_response(request)
+                finally:
+                    self.close_view_span(request)
+                response['X-Trace-Id'] = tracing.current_trace().trace_id
+                return response
+        finally:
+            tracing.finish_trace()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if tracing.current_trace() is None:
+            return None
+        view_span = tracing.span('view', view=slow_queries.view_name(request))
+        view_span.__enter__()
+        request._view_span = view_span
+        return None
+
+    def process_exception(self, request, exception):
+        self.close_view_span(request, exception)
+
+    @staticmethod
+    def close_view_span(request, exception=None):
+        view_span = request.__dict__.pop('_view_span', None)
+        if view_span is None:
+            return
+        if exception is None:
+            view_span.__exit__(None, None, None)
+        else:
+            view_span.__exit__(
+                type(exception), exception, exception.__traceback__
+            )
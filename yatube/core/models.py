@@ -1,12 +1,45 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
     """Абстрактная модель. Добавляет дату создания."""
     pub_date = models.DateTimeField(
         'Дата создания',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
 
     class Meta:
         abstract = True,
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self):
+        """Помечает записи удалёнными одним UPDATE."""
+        return self.update(is_deleted=True, deleted_at=timezone.now())
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Менеджер, который не видит помеченные удалёнными записи."""
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class SoftDeleteModel(models.Model):
+    """Абстрактная модель. Добавляет мягкое удаление."""
+    is_deleted = models.BooleanField(
+        'Удалено',
+        default=False,
+        db_index=True
+    )
+    deleted_at = models.DateTimeField(
+        'Дата удаления',
+        blank=True, null=True
+    )
+
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,121 @@
+"""Заранее отрендеренные страницы «Об авторе», «Технологии» и ошибок.
+
+Команда prerender сохраняет каждую страницу в PRERENDER_ROOT в двух
+вариантах: для гостя и для вошедшего пользователя. Меняющиеся части
+(имя пользователя, адрес запроса) остаются в файле метками и
+подставляются при отдаче. Год из футера входит в имя файла, поэтому
+после Нового года страницы рендерятся как раньше до пересборки.
+
+Если файла нет, представление рендерит шаблон обычным образом.
+"""
+import os
+from datetime import date
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import resolve
+from django.utils.html import escape
+from django.views.generic.base import TemplateView
+
+USERNAME_MARKER = '__prerender_username__'
+PATH_MARKER = '__prerender_path__'
+
+ANONYMOUS = 'anonymous'
+AUTHENTICATED = 'user'
+
+# Имя страницы -> (шаблон, адрес для выделения пункта меню)
+PAGES = {
+    'about_author': ('about/author.html', '/about/author/'),
+    'about_tech': ('about/tech.html', '/about/tech/'),
+    '403': ('core/403.html', None),
+    '403csrf': ('core/403csrf.html', None),
+    '404': ('core/404.html', None),
+    '500': ('core/500.html', None),
+}
+
+
+def page_path(name, variant, year=None):
+    year = year or date.today().year
+    return os.path.join(
+        settings.PRERENDER_ROOT, f'{name}.{variant}.{year}.html'
+    )
+
+
+def render_page(name, variant):
+    template_name, url = PAGES[name]
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = url or '/'
+    request.resolver_match = resolve(url) if url else None
+    if variant == AUTHENTICATED:
+        request.user = get_user_model()(username=USERNAME_MARKER)
+    else:
+        request.user = AnonymousUser()
+    return render_to_string(
+        template_name, {'path': PATH_MARKER}, request=request
+    )
+
+
+def build():
+    """Рендерит все страницы в PRERENDER_ROOT, возвращает пути файлов."""
+    os.makedirs(settings.PRERENDER_ROOT, exist_ok=True)
+    built = []
+    for name in PAGES:
+        for variant in (ANONYMOUS, AUTHENTICATED):
+            path = page_path(name, variant)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as page:
+                page.write(render_page(name, variant))
+            os.replace(tmp_path, path)
+            built.append(path)
+    # Файлы прошлых лет и удалённых страниц больше не нужны.
+    for filename in os.listdir(settings.PRERENDER_ROOT):
+        path = os.path.join(settings.PRERENDER_ROOT, filename)
+        if filename.split('.')[0] in PAGES and path not in built:
+            os.remove(path)
+    return built
+
+
+@lru_cache(maxsize=32)
+def read_page(path, mtime):
+    # mtime в ключе: пересобранный файл перечитывается сам.
+    with open(path, encoding='utf-8') as page:
+        return page.read()
+
+
+def serve_prerendered(request, name, status=200, anonymous=False):
+    """Ответ из готового файла или None, если файла нет.
+
+    anonymous=True отдаёт гостевой вариант, не трогая сессию, —
+    для страницы 500, когда сессия или база могут быть недоступны.
+    """
+    variant = ANONYMOUS
+    user = getattr(request, 'user', None)
+    if not anonymous and user is not None and user.is_authenticated:
+        variant = AUTHENTICATED
+    path = page_path(name, variant)
+    try:
+        content = read_page(path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+    if variant == AUTHENTICATED:
+        content = content.replace(
+            USERNAME_MARKER, escape(user.username)
+        )
+    content = content.replace(PATH_MARKER, escape(request.path))
+    return HttpResponse(content, status=status)
+
+
+class PrerenderedTemplateView(TemplateView):
+    """TemplateView, который сначала ищет готовую страницу prerender_name."""
+    prerender_name = None
+
+    def get(self, request, *args, **kwargs):
+        response = serve_prerendered(request, self.prerender_name)
+        if response is not None:
+            return response
+        return super().get(request, *args, **kwargs)
@@ -0,0 +1,114 @@
+"""Сэмплирующий профилировщик для работающих воркеров.
+
+Фоновый поток раз в PROFILER_INTERVAL секунд снимает стеки потоков
+через sys._current_frames() и считает одинаковые стеки. Результат —
+свёрнутые стеки (folded stacks) по строке на стек: кадры через «;»,
+в конце число сэмплов. Формат понимают flamegraph.pl и speedscope.
+
+В результат попадают только стеки, проходящие через модули
+PROFILER_MODULES; кадры до первого такого модуля (сервер, обработчик
+WSGI, middleware из core) отбрасываются.
+
+Два режима:
+    profile_for(seconds) — все потоки воркера в течение N секунд;
+    ProfilerMiddleware — доля запросов PROFILER_SAMPLE_RATE, стеки
+    копятся в процессе и забираются через request_stacks().
+"""
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+# Middleware проекта есть в каждом стеке запроса, началом не считается.
+SKIP_MODULES = ('core.middleware', 'core.profiling')
+
+_lock = threading.Lock()
+_request_stacks = Counter()
+
+
+def frame_label(frame):
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{frame.f_code.co_name}'
+
+
+def fold(frame):
+    """Свёрнутый стек кадра или None, если он не касается проекта."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    modules = tuple(f'{name}.' for name in settings.PROFILER_MODULES)
+    for index, label in enumerate(labels):
+        module = label.split(':')[0]
+        if module.startswith(modules) and module not in SKIP_MODULES:
+            return ';'.join(labels[index:])
+    return None
+
+
+class Sampler(threading.Thread):
+    """Поток, снимающий стеки выбранных потоков до вызова stop().
+
+    Потоки из exclude (и сам сэмплер) не снимаются.
+    """
+    def __init__(self, thread_ids=None, interval=None, exclude=()):
+        super().__init__(name='profiler', daemon=True)
+        self.thread_ids = thread_ids
+        self.exclude = set(exclude)
+        self.interval = interval or settings.PROFILER_INTERVAL
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or thread_id in self.exclude:
+                continue
+            if self.thread_ids and thread_id not in self.thread_ids:
+                continue
+            stack = fold(frame)
+            if stack:
+                self.stacks[stack] += 1
+        self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+
+def profile_for(seconds):
+    """Стеки всех потоков воркера, кроме вызывающего, за seconds секунд."""
+    # Вызывающий поток (запрос к профилировщику) всё это время спит
+    # здесь же, в выдаче он был бы только шумом.
+    sampler = Sampler(exclude={threading.get_ident()})
+    sampler.start()
+    time.sleep(seconds)
+    return sampler.stop()
+
+
+def add_request_stacks(stacks):
+    with _lock:
+        _request_stacks.update(stacks)
+
+
+def request_stacks(reset=False):
+    """Стеки, накопленные ProfilerMiddleware в этом процессе."""
+    with _lock:
+        stacks = Counter(_request_stacks)
+        if reset:
+            _request_stacks.clear()
+    return stacks
+
+
+def render_folded(stacks):
+    return ''.join(
+        f'{stack} {count}\n' for stack, count in stacks.most_common()
+    )
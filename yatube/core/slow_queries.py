@@ -0,0 +1,122 @@
+"""Журнал медленных запросов к базе с планом выполнения.
+
+SlowQueryMiddleware на время запроса ставит execute_wrapper на все
+подключения. Запрос дольше SLOW_QUERY_THRESHOLD миллисекунд пишется в
+лог вместе с представлением, параметрами и выводом EXPLAIN (в SQLite —
+EXPLAIN QUERY PLAN) и попадает в журнал процесса.
+
+Журнал агрегирует запросы по отпечатку — SQL, в котором литералы и
+списки IN заменены заглушками — и хранит не больше SLOW_QUERY_LOG_SIZE
+отпечатков, вытесняя давно не встречавшиеся.
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+SPACE_RE = re.compile(r'\s+')
+
+_lock = threading.Lock()
+_log = OrderedDict()
+_local = threading.local()
+
+
+def fingerprint(sql):
+    """SQL без литералов: одинаковый для запросов с разными параметрами."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def explain(connection, sql, params):
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+    except DatabaseError as error:
+        return f'EXPLAIN не выполнен: {error}'
+    finally:
+        _local.explaining = False
+
+
+def record(view, sql, params, duration_ms, plan):
+    key = fingerprint(sql)
+    with _lock:
+        entry = _log.pop(key, None) or {
+            'fingerprint': key, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+        }
+        entry['count'] += 1
+        entry['total_ms'] += duration_ms
+        if duration_ms >= entry['max_ms']:
+            entry.update(
+                max_ms=duration_ms, view=view, sql=sql,
+                params=repr(params), plan=plan,
+            )
+        _log[key] = entry
+        while len(_log) > settings.SLOW_QUERY_LOG_SIZE:
+            _log.popitem(last=False)
+
+
+def entries():
+    """Отпечатки по убыванию суммарного времени."""
+    with _lock:
+        items = [dict(entry) for entry in _log.values()]
+    return sorted(items, key=lambda entry: entry['total_ms'], reverse=True)
+
+
+def clear():
+    with _lock:
+        _log.clear()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return request.path
+    return match.view_name or match._func_path
+
+
+class SlowQueryWrapper:
+    """execute_wrapper, замеряющий запросы одного HTTP-запроса."""
+    def __init__(self, request):
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, 'explaining', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD:
+            plan = '' if many else explain(context['connection'], sql, params)
+            view = view_name(self.request)
+            logger.warning(
+                'Медленный запрос %.1f мс в %s: %s; параметры %r\n%s',
+                duration_ms, view, sql, params, plan,
+            )
+            record(view, sql, params, duration_ms, plan)
+        return result
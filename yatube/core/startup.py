@@ -0,0 +1,102 @@
+"""Замер запуска WSGI-воркера.
+
+Воркер запускается в отдельном процессе
+``python -X importtime -m core.startup``, чтобы импорты считались
+с нуля. Дочерний процесс проходит те же шаги, что get_wsgi_application(),
+и печатает в stdout JSON с длительностью этапов и ready() каждого
+приложения; время импорта модулей разбирается из stderr.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+IMPORT_LINE_PREFIX = 'import time:'
+
+
+def boot():
+    """Шаги get_wsgi_application() с замером каждого, в этом процессе."""
+    started = time.perf_counter()
+    import django
+    from django.apps import AppConfig
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+
+    settings.INSTALLED_APPS
+    settings_loaded = time.perf_counter()
+
+    ready_times = {}
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        config = create(cls, entry)
+        ready = config.ready
+
+        def timed_ready():
+            ready_started = time.perf_counter()
+            ready()
+            ready_times[config.label] = time.perf_counter() - ready_started
+
+        config.ready = timed_ready
+        return config
+
+    AppConfig.create = classmethod(timed_create)
+    django.setup(set_prefix=False)
+    apps_ready = time.perf_counter()
+    WSGIHandler()
+    finished = time.perf_counter()
+    return {
+        'total': finished - started,
+        'phases': {
+            'settings': settings_loaded - started,
+            'apps': apps_ready - settings_loaded,
+            'middleware': finished - apps_ready,
+        },
+        'ready': ready_times,
+    }
+
+
+def parse_importtime(output):
+    """[(модуль, собственное время, суммарное время)] в секундах."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORT_LINE_PREFIX):
+            continue
+        self_us, cumulative_us, module = (
+            part.strip()
+            for part in line[len(IMPORT_LINE_PREFIX):].split('|')
+        )
+        if not self_us.isdigit():
+            continue
+        imports.append(
+            (module, int(self_us) / 1e6, int(cumulative_us) / 1e6)
+        )
+    return imports
+
+
+def profile(settings_module, base_dir, env=None):
+    """Запускает воркер в новом процессе и возвращает замеры."""
+    env = dict(
+        os.environ, **(env or {}), DJANGO_SETTINGS_MODULE=settings_module
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', __name__],
+        cwd=base_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout)
+    report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def by_package(imports):
+    """Собственное время импорта, сложенное по пакетам верхнего уровня."""
+    totals = defaultdict(float)
+    for module, self_time, _ in imports:
+        totals[module.split('.')[0]] += self_time
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+if __name__ == '__main__':
+    print(json.dumps(boot()))
@@ -0,0 +1,35 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем в имени и сжатой копией .gz рядом.
+
+    Веб-сервер отдаёт готовый .gz (gzip_static в nginx), не сжимая
+    файлы на каждый запрос. Копия пишется, только если она меньше.
+    """
+    compress_extensions = ('.css', '.js', '.svg', '.txt', '.json', '.map')
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if isinstance(hashed_name, str):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in hashed_names:
+            if hashed_name.endswith(self.compress_extensions):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+        compressed = gzip.compress(content, compresslevel=9)
+        if len(compressed) < len(content):
+            with open(f'{path}.gz', 'wb') as target:
+                target.write(compressed)
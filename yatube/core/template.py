@@ -0,0 +1,30 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .timing import timed
+from .tracing import span
+
+
+class TracedTemplate(Template):
+    def render(self, context=None, request=None):
+        with span('template.render', template=self.origin.template_name):
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, замеряющий время каждого контекст-процессора.
+
+    Шаблоны верхнего уровня рендерятся внутри спана трассировки.
+    """
+    def __init__(self, params):
+        super().__init__(params)
+        self.engine.template_context_processors = tuple(
+            timed(f'cp-{processor.__name__}', processor)
+            for processor in self.engine.template_context_processors
+        )
+
+    def from_string(self, template_code):
+        return TracedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TracedTemplate(template.template, self)
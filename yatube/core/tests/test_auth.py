@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from ..backends import USER_CACHE_KEY
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cached')
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = Client()
+        self.auth_client.force_login(CachedUserTests.user)
+
+    def test_authenticated_page_reads_only_password(self):
+        """Сессия и пользователь из кэша, из базы — только хэш пароля."""
+        self.auth_client.get('/about/author/')
+
+        with self.assertNumQueries(1):
+            response = self.auth_client.get('/about/author/')
+
+        self.assertContains(response, 'Пользователь: cached')
+
+    def test_cached_user_invalidated_on_save(self):
+        """После сохранения пользователя кэш обновляется."""
+        self.auth_client.get('/about/author/')
+        self.user.username = 'renamed'
+        self.user.save()
+
+        response = self.auth_client.get('/about/author/')
+
+        self.assertContains(response, 'Пользователь: renamed')
+
+    def test_password_hash_not_cached(self):
+        """В кэш не попадает хэш пароля, а сессия остаётся действительной."""
+        self.auth_client.get('/about/author/')
+
+        fields = cache.get(USER_CACHE_KEY.format(self.user.pk))
+        self.assertNotIn('password', fields)
+        response = self.auth_client.get('/about/author/')
+        self.assertContains(response, 'Пользователь: cached')
+
+    def test_session_survives_password_change(self):
+        """После смены пароля пользователь из кэша остаётся в системе."""
+        self.user.set_password('old-password-1')
+        self.user.save()
+        self.auth_client.force_login(self.user)
+        self.auth_client.get('/about/author/')
+
+        response = self.auth_client.post('/auth/password_change/', {
+            'old_password': 'old-password-1',
+            'new_password1': 'new-password-2',
+            'new_password2': 'new-password-2',
+        })
+        self.assertRedirects(response, '/auth/password_change/done/')
+
+        response = self.auth_client.get('/follow/')
+        self.assertEqual(response.status_code, 200)
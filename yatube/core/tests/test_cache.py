@@ -0,0 +1,71 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import TieredCache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-tests',
+    },
+}
+
+
+def make_worker(location, **options):
+    """Экземпляры с разным LOCATION ведут себя как разные процессы."""
+    options.setdefault('SYNC_INTERVAL', 0)
+    return TieredCache(location, {'OPTIONS': options})
+
+
+@override_settings(CACHES=CACHES)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.first = make_worker('first')
+        self.second = make_worker('second')
+        self.first.clear()
+        self.second.clear()
+
+    def test_write_invalidates_other_worker(self):
+        """Запись в одном воркере не оставляет старое значение в другом."""
+        self.first.set('key', 'old')
+        self.assertEqual(self.second.get('key'), 'old')
+
+        self.first.set('key', 'new')
+
+        self.assertEqual(self.second.get('key'), 'new')
+        self.first.delete('key')
+        self.assertIsNone(self.second.get('key'))
+
+    def test_clear_reaches_other_worker(self):
+        """Очистка общего кэша сбрасывает память остальных воркеров."""
+        self.first.set('key', 'value')
+        self.second.get('key')
+
+        self.first.clear()
+
+        self.assertIsNone(self.second.get('key'))
+
+    def test_stats_per_tier(self):
+        """Статистика разделяет попадания в память и в общий кэш."""
+        self.first.set('key', 'value')
+        before = self.second.stats()
+
+        self.second.get('key')
+        self.second.get('key')
+        self.second.get('missing')
+
+        stats = self.second.stats()
+        for name in ('local_hits', 'shared_hits', 'shared_misses'):
+            with self.subTest(name=name):
+                self.assertEqual(stats[name] - before[name], 1)
+
+    def test_local_tier_is_bounded(self):
+        """Память воркера хранит не больше LOCAL_MAX_ENTRIES ключей."""
+        worker = make_worker('bounded', LOCAL_MAX_ENTRIES=2)
+        for key in ('a', 'b', 'c'):
+            worker.set(key, key)
+
+        self.assertEqual(worker.stats()['local_entries'], 2)
+        self.assertEqual(worker.get('a'), 'a')
@@ -0,0 +1,55 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+User = get_user_model()
+
+PRERENDER_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(PRERENDER_ROOT=PRERENDER_ROOT)
+class PrerenderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('prerender', stdout=StringIO())
+        cls.user = User.objects.create_user(username='reader<b>')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(PRERENDER_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.auth_client = Client()
+        self.auth_client.force_login(PrerenderTests.user)
+
+    def test_about_served_without_templates(self):
+        """Страница about отдаётся из файла, без рендеринга шаблона."""
+        response = self.guest_client.get('/about/tech/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.templates, [])
+        self.assertContains(response, 'Войти')
+
+    def test_authenticated_variant_gets_escaped_username(self):
+        """Вошедший пользователь видит своё имя в шапке."""
+        response = self.auth_client.get('/about/author/')
+
+        self.assertEqual(response.templates, [])
+        self.assertContains(response, 'Пользователь: reader&lt;b&gt;')
+
+    def test_404_substitutes_path(self):
+        """Страница 404 из файла показывает запрошенный адрес."""
+        response = self.guest_client.get('/missing/"quoted"/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.templates, [])
+        self.assertContains(
+            response, '/missing/&quot;quoted&quot;/', status_code=404
+        )
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+
+from core import profiling
+
+User = get_user_model()
+
+BUSY_SOURCE = '''
+def busy(stopped):
+    while not stopped.is_set():
+        time.sleep(0.001)
+'''
+
+
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(ProfilerTests.staff)
+
+    def test_profiler_requires_staff(self):
+        """Профилировщик недоступен обычному пользователю."""
+        client = Client()
+        client.force_login(self.user)
+
+        response = client.get('/core/profiler/', {'seconds': 0.01})
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_profiler_rejects_bad_duration(self):
+        """Длительность вне допустимых пределов отклоняется."""
+        for seconds in ('abc', '0', '3600'):
+            with self.subTest(seconds=seconds):
+                response = self.staff_client.get(
+                    '/core/profiler/', {'seconds': seconds}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_profiler_samples_project_threads(self):
+        """Стеки потоков в модулях проекта попадают в выдачу."""
+        namespace = {'__name__': 'posts.busy', 'time': time}
+        exec(BUSY_SOURCE, namespace)
+        stopped = threading.Event()
+        worker = threading.Thread(target=namespace['busy'], args=(stopped,))
+        worker.start()
+        try:
+            response = self.staff_client.get(
+                '/core/profiler/', {'seconds': 0.1}
+            )
+        finally:
+            stopped.set()
+            worker.join()
+
+        stacks = dict(
+            line.rsplit(' ', 1)
+            for line in response.content.decode().splitlines()
+        )
+        busy = [
+            stack for stack in stacks
+            if stack.split(';')[0] == 'posts.busy:busy'
+        ]
+        self.assertTrue(busy)
+        self.assertGreater(int(stacks[busy[0]]), 0)
+        # Поток самого запроса к профилировщику не снимается.
+        self.assertFalse([stack for stack in stacks if 'core.views' in stack])
+
+    def test_request_stacks_are_collected(self):
+        """Стеки отобранных запросов отдаются и сбрасываются по reset."""
+        profiling.request_stacks(reset=True)
+        profiling.add_request_stacks(Counter({'posts.views:index': 3}))
+
+        response = self.staff_client.get(
+            '/core/profiler/', {'source': 'requests', 'reset': '1'}
+        )
+
+        self.assertEqual(response.content.decode(), 'posts.views:index 3\n')
+        self.assertEqual(profiling.request_stacks(), Counter())
@@ -0,0 +1,152 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from core.management.commands.bench_http import fetch
+from posts.comment_buffer import comment_buffer
+from posts.models import Comment, Post
+from yatube.server import Arbiter, Worker, parse_args
+
+User = get_user_model()
+
+# Страница без запросов к базе: воркеры работают с настоящими
+# настройками, а не с тестовой базой.
+PATH = '/about/author/'
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+class PreforkServerTests(SimpleTestCase):
+    def start_server(self, *args):
+        self.port = free_port()
+        # Лог в файл: непрочитанный канал заполнился бы и остановил воркеры.
+        self.log = tempfile.TemporaryFile('w+')
+        self.addCleanup(self.log.close)
+        self.server = subprocess.Popen(
+            [sys.executable, '-m', 'yatube.server',
+             '--bind', f'127.0.0.1:{self.port}', '--workers', '2',
+             '--threads', '2', '--warmup', PATH, '--log-level', 'DEBUG',
+             *args],
+            cwd=settings.BASE_DIR,
+            env=dict(os.environ, DJANGO_ENV='dev'),
+            stderr=self.log,
+        )
+        self.addCleanup(self.server.kill)
+        deadline = time.monotonic() + 30
+        while fetch('127.0.0.1', self.port, PATH) is None:
+            self.assertLess(time.monotonic(), deadline, 'Сервер не поднялся')
+            time.sleep(0.1)
+
+    def stop_server(self):
+        self.server.send_signal(signal.SIGTERM)
+        self.server.wait(timeout=30)
+        self.log.seek(0)
+        return self.log.read()
+
+    def get_many(self, count, concurrency=4):
+        results = []
+
+        def client():
+            for _ in range(count // concurrency):
+                results.append(fetch('127.0.0.1', self.port, PATH))
+
+        threads = [
+            threading.Thread(target=client) for _ in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_workers_recycled_without_errors(self):
+        """Воркеры перезапускаются после max-requests, запросы не теряются."""
+        self.start_server('--max-requests', '3', '--max-requests-jitter', '0')
+
+        results = self.get_many(24)
+        log = self.stop_server()
+
+        self.assertNotIn(None, results)
+        self.assertIn('отработал и вышел', log)
+        self.assertEqual(self.server.returncode, 0)
+
+    def test_graceful_reload(self):
+        """HUP поднимает новое поколение воркеров без потери запросов."""
+        self.start_server('--max-requests', '0')
+        results = []
+        done = threading.Event()
+
+        def load():
+            while not done.is_set():
+                results.append(fetch('127.0.0.1', self.port, PATH))
+
+        thread = threading.Thread(target=load)
+        thread.start()
+        time.sleep(0.2)
+        self.server.send_signal(signal.SIGHUP)
+        time.sleep(3)
+        done.set()
+        thread.join()
+        log = self.stop_server()
+
+        self.assertIn('Плавный перезапуск', log)
+        self.assertGreaterEqual(log.count('готов'), 4)
+        self.assertTrue(results)
+        self.assertNotIn(None, results)
+
+
+class WorkerShutdownTests(TransactionTestCase):
+    def setUp(self):
+        buffer_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(buffer_dir.cleanup)
+        settings_override = override_settings(
+            COMMENT_BUFFER_ENABLED=True,
+            COMMENT_BUFFER_SIZE=10,
+            COMMENT_BUFFER_INTERVAL=60,
+            COMMENT_BUFFER_DIR=buffer_dir.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Воркер ставит свои обработчики сигналов, тесту нужны прежние.
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP,
+                       signal.SIGCHLD):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    def test_recycled_worker_flushes_comment_buffer(self):
+        """Воркер, вышедший по max-requests, дописывает буфер в базу."""
+        user = User.objects.create_user(username='late')
+        post = Post.objects.create(author=user, text='Пост')
+        comment_buffer.add(Comment(post=post, author=user, text='В буфере'))
+        port = free_port()
+        options = parse_args([
+            '--bind', f'127.0.0.1:{port}', '--threads', '1',
+            '--max-requests', '1', '--max-requests-jitter', '0',
+            '--warmup', PATH,
+        ])
+        listener = Arbiter(options).bind()
+        self.addCleanup(listener.close)
+        ready_read, ready_write = os.pipe()
+        self.addCleanup(os.close, ready_read)
+        client = threading.Thread(
+            target=fetch, args=('127.0.0.1', port, PATH)
+        )
+        client.start()
+
+        Worker(listener, options).run(ready_write)
+        client.join()
+
+        self.assertEqual(Comment.objects.get().text, 'В буфере')
+        self.assertFalse(os.path.exists(comment_buffer.journal_path))
@@ -0,0 +1,103 @@
+import importlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from yatube.settings import base
+
+
+def load_settings(name, **env):
+    with mock.patch.dict(os.environ, env):
+        return importlib.reload(importlib.import_module(name))
+
+
+class SettingsLayersTests(SimpleTestCase):
+    def test_prod_drops_debug_overhead(self):
+        """В prod нет отладки, debug_toolbar и Server-Timing."""
+        prod = load_settings('yatube.settings.prod', SECRET_KEY='test')
+
+        self.assertFalse(prod.DEBUG)
+        self.assertFalse(prod.SERVER_TIMING)
+        self.assertNotIn('debug_toolbar', prod.INSTALLED_APPS)
+        self.assertFalse(
+            [name for name in prod.MIDDLEWARE if 'debug_toolbar' in name]
+        )
+        self.assertEqual(prod.MIDDLEWARE[-1], base.MIDDLEWARE[-1])
+
+    def test_prod_performance_settings(self):
+        """В prod кэш шаблонов, постоянные соединения и общий кэш."""
+        prod = load_settings(
+            'yatube.settings.prod',
+            SECRET_KEY='test',
+            CONN_MAX_AGE='300',
+            MEMCACHED_LOCATION='10.0.0.1:11211,10.0.0.2:11211',
+        )
+
+        loader, _ = prod.TEMPLATES[0]['OPTIONS']['loaders'][0]
+        self.assertEqual(loader, 'django.template.loaders.cached.Loader')
+        self.assertEqual(prod.DATABASES['default']['CONN_MAX_AGE'], 300)
+        self.assertEqual(
+            prod.CACHES['shared']['LOCATION'],
+            ['10.0.0.1:11211', '10.0.0.2:11211'],
+        )
+        self.assertEqual(
+            prod.CACHES['versions']['LOCATION'],
+            prod.CACHES['shared']['LOCATION'],
+        )
+        self.assertEqual(
+            prod.STATICFILES_STORAGE,
+            'core.storage.CompressedManifestStaticFilesStorage',
+        )
+        # Базовые настройки, общие с dev, не меняются.
+        self.assertNotIn('loaders', base.TEMPLATES[0]['OPTIONS'])
+        self.assertEqual(base.DATABASES['default'].get('CONN_MAX_AGE', 0), 0)
+
+    def test_prod_requires_secret_key(self):
+        """Без SECRET_KEY в окружении prod не загружается."""
+        with mock.patch.dict(os.environ, clear=True):
+            with self.assertRaises(KeyError):
+                importlib.reload(importlib.import_module(
+                    'yatube.settings.prod'
+                ))
+
+    def test_dev_keeps_debug_toolbar(self):
+        """В dev debug_toolbar стоит перед последней TracingMiddleware."""
+        dev = load_settings('yatube.settings.dev')
+
+        self.assertTrue(dev.DEBUG)
+        self.assertIn('debug_toolbar', dev.INSTALLED_APPS)
+        self.assertEqual(
+            dev.MIDDLEWARE[-2:],
+            ['debug_toolbar.middleware.DebugToolbarMiddleware',
+             'core.middleware.TracingMiddleware'],
+        )
+
+
+class CompressedStaticStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.static_root, True)
+
+    def test_collectstatic_writes_gzip_copies(self):
+        """collectstatic кладёт сжатые копии рядом с хэшированными файлами."""
+        with override_settings(
+            STATIC_ROOT=self.static_root,
+            STATICFILES_DIRS=[],
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'
+            ),
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+        compressed = [
+            name
+            for _, _, names in os.walk(self.static_root)
+            for name in names if name.endswith('.css.gz')
+        ]
+        self.assertTrue(compressed)
+        self.assertTrue(all(name.count('.') >= 3 for name in compressed))
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(author=cls.staff, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        slow_queries.clear()
+        self.staff_client = Client()
+        self.staff_client.force_login(SlowQueryLogTests.staff)
+
+    def test_fingerprint_hides_literals(self):
+        """Запросы с разными параметрами дают один отпечаток."""
+        self.assertEqual(
+            slow_queries.fingerprint(
+                "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a'"
+            ),
+            slow_queries.fingerprint(
+                'SELECT * FROM t WHERE id IN (%s)  AND name = %s'
+            ),
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_slow_queries_logged_with_plan(self):
+        """Медленные запросы попадают в журнал с представлением и планом."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            Client().get(reverse('posts:index'))
+
+        entries = [
+            entry for entry in slow_queries.entries()
+            if 'posts_post' in entry['fingerprint']
+        ]
+        self.assertTrue(entries)
+        self.assertEqual(entries[0]['view'], 'posts:index')
+        self.assertTrue(entries[0]['plan'])
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_entries_aggregated_by_fingerprint(self):
+        """Повторный запрос увеличивает счётчик, а не добавляет строку."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            for _ in range(2):
+                cache.clear()
+                Client().get(reverse('posts:index'))
+
+        counts = [entry['count'] for entry in slow_queries.entries()]
+        self.assertIn(2, counts)
+        self.assertEqual(
+            len(counts),
+            len({entry['fingerprint'] for entry in slow_queries.entries()}),
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_admin_page_lists_entries(self):
+        """Журнал виден персоналу в админке и очищается POST-запросом."""
+        with self.assertLogs('core.slow_queries', 'WARNING'):
+            Client().get(reverse('posts:index'))
+
+        with override_settings(SLOW_QUERY_THRESHOLD=None):
+            response = self.staff_client.get(reverse('slow_query_log'))
+            self.assertContains(response, 'posts:index')
+            self.staff_client.post(reverse('slow_query_log'))
+
+        self.assertEqual(slow_queries.entries(), [])
@@ -0,0 +1,54 @@
+import os
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.startup import profile
+
+PRODUCTION_SETTINGS = 'yatube.settings.prod'
+
+PRODUCTION_ENV = {'SECRET_KEY': 'startup-test'}
+
+
+class StartupTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = profile(
+            PRODUCTION_SETTINGS, settings.BASE_DIR, PRODUCTION_ENV
+        )
+
+    def test_boot_within_budget(self):
+        """Воркер с боевыми настройками запускается в пределах бюджета."""
+        self.assertLess(self.report['total'], settings.STARTUP_TIME_BUDGET)
+
+    def test_heavy_modules_deferred(self):
+        """Отладочные приложения, Pillow и движки sorl не грузятся."""
+        modules = {module for module, _, _ in self.report['imports']}
+        for prefix in ('debug_toolbar', 'PIL', 'sorl.thumbnail.engines'):
+            with self.subTest(prefix=prefix):
+                self.assertFalse([
+                    module for module in modules
+                    if module == prefix or module.startswith(f'{prefix}.')
+                ])
+
+    def test_ready_timed_per_app(self):
+        """В отчёте есть время ready() каждого приложения."""
+        self.assertIn('posts', self.report['ready'])
+        self.assertNotIn('debug_toolbar', self.report['ready'])
+
+    def test_command_prints_report(self):
+        """Команда startup_profile печатает этапы и модули."""
+        out = StringIO()
+
+        with mock.patch.dict(os.environ, PRODUCTION_ENV):
+            call_command(
+                'startup_profile', target=PRODUCTION_SETTINGS, limit=3,
+                stdout=out,
+            )
+
+        self.assertIn('Запуск воркера', out.getvalue())
+        self.assertIn('ready() приложений', out.getvalue())
@@ -0,0 +1,50 @@
+import datetime as dt
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.module_loading import import_string
+
+from core import timing
+from core.context_processors.year import year
+
+
+class ContextProcessorTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_year_is_lazy(self):
+        """Год вычисляется только при обращении из шаблона."""
+        context = year(None)
+
+        self.assertIs(context['year']._wrapped, empty)
+        self.assertEqual(str(context['year']), str(dt.datetime.now().year))
+
+    def test_builtin_processors_are_lazy(self):
+        """auth и messages сами не читают ни пользователя, ни сессию."""
+        request = RequestFactory().get('/')
+        request.user = SimpleLazyObject(self.fail)
+        request._messages = SimpleLazyObject(self.fail)
+
+        for path in settings.TEMPLATES[0]['OPTIONS']['context_processors']:
+            with self.subTest(processor=path):
+                import_string(path)(request)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        """Время контекст-процессоров отдаётся в Server-Timing."""
+        response = self.guest_client.get('/')
+
+        header = response['Server-Timing']
+        self.assertIn('cp-auth;dur=', header)
+        self.assertIn('cp-year-year;dur=', header)
+        self.assertGreaterEqual(timing.stats()['cp-year']['calls'], 1)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        """Без SERVER_TIMING заголовок не добавляется."""
+        response = self.guest_client.get('/')
+
+        self.assertFalse(response.has_header('Server-Timing'))
@@ -0,0 +1,180 @@
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import tracing
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Заглушка коллектора OTLP/HTTP: запоминает присланные трассы."""
+    received = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.received.append((self.path, json.loads(self.rfile.read(length))))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TracingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.post = Post.objects.create(
+            author=cls.staff,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.trace_file = os.path.join(TEMP_MEDIA_ROOT, 'traces.ndjson')
+        if os.path.exists(self.trace_file):
+            os.remove(self.trace_file)
+
+    def read_spans(self):
+        tracing.flush()
+        with open(self.trace_file, encoding='utf-8') as traces:
+            return [
+                span
+                for line in traces
+                for resource in json.loads(line)['resourceSpans']
+                for scope in resource['scopeSpans']
+                for span in scope['spans']
+            ]
+
+    def test_sampled_request_exports_spans(self):
+        """Трасса содержит спаны всех слоёв и связана в дерево."""
+        with override_settings(
+            TRACING_SAMPLE_RATE=1, TRACING_FILE=self.trace_file
+        ):
+            response = Client().get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            )
+
+        spans = self.read_spans()
+        names = {span['name'] for span in spans}
+        for name in ('http.request', 'view', 'db.query', 'cache.get',
+                     'template.render', 'template.include', 'thumbnail'):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+        ids = {span['spanId'] for span in spans}
+        roots = [span for span in spans if 'parentSpanId' not in span]
+        self.assertEqual([span['name'] for span in roots], ['http.request'])
+        self.assertTrue(all(
+            span['parentSpanId'] in ids for span in spans if span not in roots
+        ))
+        self.assertEqual(response['X-Trace-Id'], roots[0]['traceId'])
+
+    def test_unsampled_request_not_traced(self):
+        """Без сэмплирования трасса не пишется."""
+        with override_settings(
+            TRACING_SAMPLE_RATE=0, TRACING_FILE=self.trace_file
+        ):
+            response = Client().get(reverse('posts:index'))
+
+        tracing.flush()
+        self.assertFalse(response.has_header('X-Trace-Id'))
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    def test_staff_can_force_trace(self):
+        """Персонал включает трассу заголовком X-Trace."""
+        client = Client()
+        client.force_login(self.staff)
+
+        with override_settings(
+            TRACING_SAMPLE_RATE=0, TRACING_FILE=self.trace_file
+        ):
+            response = client.get(reverse('posts:index'), HTTP_X_TRACE='1')
+
+        self.assertTrue(response.has_header('X-Trace-Id'))
+        self.assertTrue(self.read_spans())
+
+    def test_otlp_exporter_posts_to_collector(self):
+        """Экспортёр otlp отправляет трассу коллектору по HTTP."""
+        server = HTTPServer(('127.0.0.1', 0), CollectorHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f'http://127.0.0.1:{server.server_port}/v1/traces'
+        CollectorHandler.received.clear()
+        try:
+            with override_settings(
+                TRACING_SAMPLE_RATE=1,
+                TRACING_EXPORTER='otlp',
+                TRACING_ENDPOINT=endpoint,
+            ):
+                Client().get(reverse('posts:index'))
+            tracing.flush()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        path, payload = CollectorHandler.received[0]
+        self.assertEqual(path, '/v1/traces')
+        scope = payload['resourceSpans'][0]['scopeSpans'][0]
+        names = [span['name'] for span in scope['spans']]
+        self.assertIn('http.request', names)
+
+    def test_view_span_closed_when_view_raises(self):
+        """Спан view закрывается и при исключении в представлении."""
+        with override_settings(
+            TRACING_SAMPLE_RATE=1, TRACING_FILE=self.trace_file
+        ):
+            response = Client().get(
+                reverse('posts:post_detail', args=[self.post.pk + 1000])
+            )
+
+        self.assertEqual(response.status_code, 404)
+        spans = {span['name']: span for span in self.read_spans()}
+        self.assertIn('endTimeUnixNano', spans['view'])
+        self.assertEqual(
+            spans['view']['parentSpanId'], spans['http.request']['spanId']
+        )
+
+    def test_full_queue_drops_trace(self):
+        """При полной очереди трасса теряется, а не копится в памяти."""
+        dropped = tracing.dropped()
+        tracing.start_trace()
+        with tracing.span('test'):
+            pass
+        with mock.patch.object(
+            tracing._queue, 'put_nowait', side_effect=queue.Full
+        ):
+            tracing.finish_trace()
+
+        self.assertEqual(tracing.dropped(), dropped + 1)
@@ -0,0 +1,10 @@
+from sorl.thumbnail.base import ThumbnailBackend
+
+from .tracing import span
+
+
+class TracedThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail со спаном на получение миниатюры."""
+    def get_thumbnail(self, file_, geometry_string, **options):
+        with span('thumbnail', file=str(file_), geometry=geometry_string):
+            return super().get_thumbnail(file_, geometry_string, **options)
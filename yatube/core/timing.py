@@ -0,0 +1,72 @@
+"""Замеры стоимости контекст-процессоров и ленивые значения контекста.
+
+Время каждого контекст-процессора (и вычисления ленивых значений)
+копится для текущего запроса и для процесса в целом. ServerTimingMiddleware
+отдаёт замеры запроса в заголовке Server-Timing, stats() — суммы
+по процессу.
+"""
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.utils.functional import SimpleLazyObject
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = defaultdict(lambda: {'calls': 0, 'total_ms': 0.0})
+
+
+def start_request():
+    _local.timings = defaultdict(float)
+
+
+def finish_request():
+    """Замеры текущего запроса в миллисекундах."""
+    timings = getattr(_local, 'timings', None) or {}
+    _local.timings = None
+    return dict(timings)
+
+
+def record(name, seconds):
+    ms = seconds * 1000
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[name] += ms
+    with _lock:
+        _totals[name]['calls'] += 1
+        _totals[name]['total_ms'] += ms
+
+
+def stats():
+    """Число вызовов и суммарное время по каждому замеру в процессе."""
+    with _lock:
+        return {name: dict(total) for name, total in _totals.items()}
+
+
+def timed(name, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - started)
+    return wrapper
+
+
+def lazy_processor(processor):
+    """Контекст-процессор, значения которого считаются при обращении.
+
+    Процессор возвращает словарь функций без аргументов; шаблон, не
+    использующий переменную, не платит за её вычисление.
+    """
+    @wraps(processor)
+    def wrapper(request):
+        return {
+            key: SimpleLazyObject(
+                timed(f'cp-{processor.__name__}-{key}', factory)
+            )
+            for key, factory in processor(request).items()
+        }
+    return wrapper
@@ -0,0 +1,202 @@
+"""Трассировка запросов: спаны представления, ORM, кэша, шаблонов и миниатюр.
+
+TracingMiddleware открывает трассу для доли TRACING_SAMPLE_RATE запросов
+(персонал может включить её заголовком X-Trace: 1). Внутри трассы
+span() записывает вложенные отрезки времени; вне трассы span() ничего
+не делает и почти ничего не стоит.
+
+Готовые трассы отдаются фоновому потоку в формате OTLP/JSON:
+    TRACING_EXPORTER = 'file' — строка JSON на трассу в TRACING_FILE;
+    TRACING_EXPORTER = 'otlp' — POST на TRACING_ENDPOINT
+    (OTLP/HTTP, например http://localhost:4318/v1/traces).
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Сколько готовых трасс ждёт экспорта; сверх этого трассы теряются,
+# а не копятся в памяти, если коллектор недоступен.
+QUEUE_SIZE = 1000
+
+_local = threading.local()
+_queue = queue.Queue(QUEUE_SIZE)
+_dropped = 0
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans = []
+        self.stack = []
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def span(name, **attributes):
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    record = {
+        'traceId': trace.trace_id,
+        'spanId': os.urandom(8).hex(),
+        'name': name,
+        'startTimeUnixNano': time.time_ns(),
+        'attributes': attributes,
+    }
+    if trace.stack:
+        record['parentSpanId'] = trace.stack[-1]['spanId']
+    trace.stack.append(record)
+    try:
+        yield
+    finally:
+        trace.stack.pop()
+        record['endTimeUnixNano'] = time.time_ns()
+        trace.spans.append(record)
+
+
+def traced(name):
+    """Декоратор метода кэша: спан с ключом из первого аргумента."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, key, *args, **kwargs):
+            if current_trace() is None:
+                return method(self, key, *args, **kwargs)
+            with span(name, key=str(key)[:200]):
+                return method(self, key, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace():
+    _local.trace = Trace()
+    return _local.trace
+
+
+def finish_trace():
+    trace, _local.trace = current_trace(), None
+    if trace is not None and trace.spans:
+        ensure_exporter()
+        # Куда писать, решается сейчас: поток экспорта настроек не читает.
+        if settings.TRACING_EXPORTER == 'otlp':
+            target = ('otlp', settings.TRACING_ENDPOINT)
+        else:
+            target = ('file', settings.TRACING_FILE)
+        try:
+            _queue.put_nowait((to_otlp(trace.spans), target))
+        except queue.Full:
+            drop()
+
+
+def drop():
+    global _dropped
+    with _exporter_lock:
+        _dropped += 1
+        dropped = _dropped
+    # Раз в QUEUE_SIZE потерь, чтобы не засорять журнал.
+    if dropped % QUEUE_SIZE == 1:
+        logger.warning('Очередь экспорта полна, трасс потеряно: %s', dropped)
+
+
+def dropped():
+    """Сколько трасс потеряно из-за переполненной очереди."""
+    return _dropped
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """execute_wrapper: спан на каждый запрос к базе."""
+    with span('db.query', sql=sql, many=many):
+        return execute(sql, params, many, context)
+
+
+# Экспорт
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(spans):
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{
+            'key': 'service.name',
+            'value': {'stringValue': settings.TRACING_SERVICE_NAME},
+        }]},
+        'scopeSpans': [{
+            'scope': {'name': __name__},
+            'spans': [
+                {
+                    **record,
+                    'kind': 1,
+                    'startTimeUnixNano': str(record['startTimeUnixNano']),
+                    'endTimeUnixNano': str(record['endTimeUnixNano']),
+                    'attributes': [
+                        {'key': key, 'value': otlp_value(value)}
+                        for key, value in record['attributes'].items()
+                    ],
+                }
+                for record in spans
+            ],
+        }],
+    }]}
+
+
+def export(payload, target):
+    payload = json.dumps(payload, ensure_ascii=False)
+    exporter, destination = target
+    if exporter == 'otlp':
+        request = urllib.request.Request(
+            destination,
+            data=payload.encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+    else:
+        with open(destination, 'a', encoding='utf-8') as output:
+            output.write(payload + '\n')
+
+
+def export_loop():
+    while True:
+        payload, target = _queue.get()
+        try:
+            export(payload, target)
+        except Exception:
+            logger.exception('Трасса не экспортирована')
+        finally:
+            _queue.task_done()
+
+
+def ensure_exporter():
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = threading.Thread(
+                target=export_loop, name='trace-exporter', daemon=True
+            )
+            _exporter.start()
+
+
+def flush():
+    """Ждёт, пока все готовые трассы будут экспортированы."""
+    _queue.join()
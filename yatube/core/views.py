@@ -1,21 +1,78 @@
 from http import HTTPStatus
-from django.shortcuts import render
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib import admin
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.shortcuts import redirect, render
+
+from . import profiling, slow_queries
+from .prerender import serve_prerendered
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'core/403csrf.html')
+    return (
+        serve_prerendered(request, '403csrf')
+        or render(request, 'core/403csrf.html')
+    )
 
 
 def permission_denied(request, exception):
-    return render(request, 'core/403.html',
+    return (
+        serve_prerendered(request, '403', HTTPStatus.FORBIDDEN)
+        or render(request, 'core/403.html', {'path': request.path},
                   status=HTTPStatus.FORBIDDEN)
+    )
 
 
 def page_not_found(request, exception):
-    return render(request, 'core/404.html', {'path': request.path},
+    return (
+        serve_prerendered(request, '404', HTTPStatus.NOT_FOUND)
+        or render(request, 'core/404.html', {'path': request.path},
                   status=HTTPStatus.NOT_FOUND)
+    )
 
 
 def server_error(request):
-    return render(request, 'core/500.html',
+    return (
+        serve_prerendered(
+            request, '500', HTTPStatus.INTERNAL_SERVER_ERROR, anonymous=True
+        )
+        or render(request, 'core/500.html',
                   status=HTTPStatus.INTERNAL_SERVER_ERROR)
+    )
+
+
+# Свёрнутые стеки воркера за ?seconds=N или накопленные по запросам
+@staff_member_required
+def profiler(request):
+    if request.GET.get('source') == 'requests':
+        stacks = profiling.request_stacks(reset='reset' in request.GET)
+    else:
+        try:
+            seconds = float(request.GET.get('seconds', 5))
+        except ValueError:
+            return HttpResponseBadRequest('seconds должно быть числом')
+        if not 0 < seconds <= settings.PROFILER_MAX_SECONDS:
+            return HttpResponseBadRequest(
+                f'seconds от 0 до {settings.PROFILER_MAX_SECONDS}'
+            )
+        stacks = profiling.profile_for(seconds)
+    return HttpResponse(
+        profiling.render_folded(stacks), content_type='text/plain'
+    )
+
+
+# Журнал медленных запросов в админке, POST очищает журнал
+@staff_member_required
+def slow_query_log(request):
+    if request.method == 'POST':
+        slow_queries.clear()
+        return redirect('slow_query_log')
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Медленные запросы',
+        'entries': slow_queries.entries(),
+        'threshold': settings.SLOW_QUERY_THRESHOLD,
+    }
+    return render(request, 'core/slow_queries.html', context)
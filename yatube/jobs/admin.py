@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'status', 'priority', 'run_at', 'attempts', 'locked_by',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    actions = ('requeue',)
+
+    def requeue(self, request, queryset):
+        queryset.update(status=Job.QUEUED, attempts=0, locked_by='')
+    requeue.short_description = 'Вернуть в очередь'
+
+
+admin.site.register(Job, JobAdmin)
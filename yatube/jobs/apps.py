@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    name = 'jobs'
+
+    def ready(self):
+        # Обработчики задач объявляются в модулях tasks приложений.
+        autodiscover_modules('tasks')
+        from . import mail  # noqa: F401
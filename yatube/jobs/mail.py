@@ -0,0 +1,112 @@
+"""Отправка писем через очередь задач.
+
+QueuedEmailBackend только ставит письма в очередь, поэтому запрос
+(например, сброс пароля) не ждёт почтового сервера. Воркер отправляет
+их пачками по EMAIL_BATCH_SIZE через одно соединение бэкенда
+QUEUED_EMAIL_BACKEND и повторяет только неотправленные письма.
+"""
+import base64
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .registry import BatchError, enqueue, task
+
+SEND_EMAIL = 'jobs.send_email'
+
+
+def dump_attachment(attachment):
+    if isinstance(attachment, MIMEBase):
+        filename = attachment.get_filename()
+        content = attachment.get_payload(decode=True)
+        mimetype = attachment.get_content_type()
+    else:
+        filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return {
+        'filename': filename,
+        'content': base64.b64encode(content).decode(),
+        'mimetype': mimetype,
+    }
+
+
+def dump_message(message):
+    """Письмо в виде словаря для JSON: задачу может править персонал.
+
+    Сохраняются только данные письма; соединение воркеру не нужно.
+    """
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'content_subtype': message.content_subtype,
+        'from_email': message.from_email,
+        'to': list(message.to),
+        'cc': list(message.cc),
+        'bcc': list(message.bcc),
+        'reply_to': list(message.reply_to),
+        'headers': dict(message.extra_headers),
+        'alternatives': [
+            list(alternative)
+            for alternative in getattr(message, 'alternatives', [])
+        ],
+        'attachments': [
+            dump_attachment(attachment)
+            for attachment in message.attachments
+        ],
+    }
+
+
+def load_message(data):
+    """Собирает EmailMultiAlternatives из словаря dump_message."""
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+    )
+    message.content_subtype = data['content_subtype']
+    for attachment in data['attachments']:
+        message.attach(
+            attachment['filename'],
+            base64.b64decode(attachment['content']),
+            attachment['mimetype'],
+        )
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        queued = 0
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            enqueue(SEND_EMAIL, {'message': dump_message(message)})
+            queued += 1
+        return queued
+
+
+@task(SEND_EMAIL, batch_size=settings.EMAIL_BATCH_SIZE, max_attempts=5)
+def send_email(payloads):
+    connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    failed = []
+    connection.open()
+    try:
+        for index, payload in enumerate(payloads):
+            try:
+                connection.send_messages([load_message(payload['message'])])
+            except Exception as error:
+                failed.append(index)
+                last_error = error
+    finally:
+        connection.close()
+    if failed:
+        raise BatchError(failed, f'Не отправлено писем: {len(failed)}, '
+                                 f'последняя ошибка: {last_error!r}')
@@ -0,0 +1,14 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Показывает глубину очереди задач в JSON.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            json.dumps(Job.objects.stats(), ensure_ascii=False, indent=2)
+        )
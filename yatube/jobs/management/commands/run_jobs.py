@@ -0,0 +1,62 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker
+
+
+def work(names, once):
+    worker = Worker(names)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(once=once)
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает воркеры очереди задач. По SIGTERM или Ctrl+C воркеры '
+        'доделывают текущую пачку и завершаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Сколько процессов-воркеров запустить',
+        )
+        parser.add_argument(
+            '--task', action='append', dest='names',
+            help='Выполнять только эти задачи (можно несколько раз)',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда очередь опустеет',
+        )
+
+    def handle(self, *args, **options):
+        names = options['names']
+        once = options['once']
+        if options['workers'] <= 1:
+            work(names, once)
+            return
+
+        # Соединения с базой не должны достаться дочерним процессам.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=(names, once))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS('Воркеры остановлены'))
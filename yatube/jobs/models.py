@@ -0,0 +1,80 @@
+from django.db import models
+from django.db.models import Count, Min
+from django.utils import timezone
+
+
+class JobQuerySet(models.QuerySet):
+    def stats(self):
+        """Глубина очереди: число задач по типам и состояниям.
+
+        oldest_queued_age — сколько секунд ждёт самая старая задача,
+        которую уже пора выполнять.
+        """
+        now = timezone.now()
+        depth = {}
+        for row in self.values('name', 'status').annotate(
+            count=Count('pk')
+        ).order_by('name', 'status'):
+            depth.setdefault(row['name'], {})[row['status']] = row['count']
+        oldest = self.filter(
+            status=self.model.QUEUED, run_at__lte=now
+        ).aggregate(oldest=Min('run_at'))['oldest']
+        return {
+            'queued': sum(
+                counts.get(self.model.QUEUED, 0) for counts in depth.values()
+            ),
+            'failed': sum(
+                counts.get(self.model.FAILED, 0) for counts in depth.values()
+            ),
+            'oldest_queued_age': (
+                (now - oldest).total_seconds() if oldest else 0
+            ),
+            'by_task': depth,
+        }
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Параметры (JSON)', default='{}')
+    priority = models.SmallIntegerField(
+        'Приоритет', default=0,
+        help_text='Задачи с большим приоритетом выполняются раньше',
+    )
+    run_at = models.DateTimeField('Не раньше', default=timezone.now)
+    status = models.CharField(
+        'Состояние', max_length=10, choices=STATUSES, default=QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    locked_by = models.CharField('Воркер', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'pk']
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'], name='job_pending'
+            ),
+        ]
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
@@ -0,0 +1,75 @@
+"""Регистрация обработчиков и постановка задач в очередь.
+
+Обработчик объявляется в модуле tasks приложения::
+
+    @task('posts.make_thumbnails', batch_size=50)
+    def make_thumbnails(payloads):
+        ...
+
+Обычный обработчик получает параметры задачи именованными аргументами,
+пакетный (batch_size) — список параметров всех взятых задач сразу.
+Задача пишется в ту же базу, что и данные, в текущей транзакции.
+Внутри transaction.atomic() воркер увидит её только после фиксации,
+а при откате она исчезнет вместе с данными. Вне atomic (запросы здесь
+идут без ATOMIC_REQUESTS) задача фиксируется сразу, поэтому ставить её
+нужно после записи данных, от которых она зависит.
+"""
+import json
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Job
+
+registry = {}
+
+
+class BatchError(Exception):
+    """Часть пачки не выполнена; failed — номера этих параметров.
+
+    Выполненные задачи пачки удаляются, повторяются только упавшие.
+    """
+    def __init__(self, failed, message=''):
+        super().__init__(message)
+        self.failed = set(failed)
+
+
+class Task:
+    def __init__(self, func, name, batch_size=None, max_attempts=3):
+        self.func = func
+        self.name = name
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    def __call__(self, payloads):
+        if self.batch_size:
+            return self.func(payloads)
+        return self.func(**payloads[0])
+
+
+def task(name, batch_size=None, max_attempts=3):
+    """Регистрирует обработчик задачи name."""
+    def decorator(func):
+        registry[name] = Task(func, name, batch_size, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, priority=0, run_at=None, delay=None):
+    """Ставит задачу в очередь; delay — секунды или timedelta."""
+    if name not in registry:
+        raise LookupError(f'Неизвестная задача: {name}')
+    if run_at is None:
+        run_at = timezone.now()
+    if delay is not None:
+        if not isinstance(delay, timedelta):
+            delay = timedelta(seconds=delay)
+        run_at += delay
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps(payload or {}, cls=DjangoJSONEncoder),
+        priority=priority,
+        run_at=run_at,
+        max_attempts=registry[name].max_attempts,
+    )
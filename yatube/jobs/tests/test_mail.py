@@ -0,0 +1,140 @@
+import json
+import socketserver
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..mail import dump_message, load_message
+from ..models import Job
+from ..worker import Worker
+
+User = get_user_model()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и складывает в список."""
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        data = None
+        for raw in self.rfile:
+            line = raw.decode().rstrip('\r\n')
+            if data is not None:
+                if line == '.':
+                    self.server.messages.append('\n'.join(data))
+                    data = None
+                    self.reply('250 OK')
+                else:
+                    data.append(line)
+                continue
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif command == 'RCPT' and 'rejected@' in line:
+                self.reply('550 No such user')
+            elif command == 'DATA':
+                data = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+class QueuedEmailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.smtp = SMTPServer()
+        threading.Thread(target=cls.smtp.serve_forever, daemon=True).start()
+        cls.settings = override_settings(
+            EMAIL_BACKEND='jobs.mail.QueuedEmailBackend',
+            QUEUED_EMAIL_BACKEND=(
+                'django.core.mail.backends.smtp.EmailBackend'
+            ),
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=cls.smtp.server_address[1],
+        )
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.smtp.shutdown()
+        cls.smtp.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.smtp.connections = 0
+        self.smtp.messages.clear()
+
+    def test_password_reset_is_sent_by_worker(self):
+        """Сброс пароля не ждёт почту: письмо отправляет воркер."""
+        User.objects.create_user(
+            username='forgetful', email='f@example.com', password='secret'
+        )
+
+        self.client.post(
+            reverse('users:password_reset_form'), {'email': 'f@example.com'}
+        )
+        self.assertEqual(self.smtp.messages, [])
+        self.assertEqual(Job.objects.stats()['queued'], 1)
+
+        Worker().run(once=True)
+
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertIn('f@example.com', self.smtp.messages[0])
+
+    def test_batch_reuses_connection_and_retries_failures(self):
+        """Пачка идёт через одно соединение, повторяются только ошибки."""
+        for address in ('a@example.com', 'rejected@example.com',
+                        'b@example.com'):
+            send_mail('Тема', 'Текст', None, [address])
+
+        Worker().run(once=True)
+
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 2)
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+
+
+class MessagePayloadTests(SimpleTestCase):
+    def test_message_survives_json_round_trip(self):
+        """Письмо хранится в задаче как JSON и собирается обратно."""
+        message = EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            bcc=['bcc@example.com'], reply_to=['reply@example.com'],
+            headers={'X-Tag': 'welcome'},
+        )
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('data.bin', b'\x00\x01', 'application/octet-stream')
+
+        payload = json.loads(json.dumps(dump_message(message)))
+        restored = load_message(payload)
+
+        self.assertEqual(restored.subject, 'Тема')
+        self.assertEqual(restored.recipients(), message.recipients())
+        self.assertEqual(restored.reply_to, ['reply@example.com'])
+        self.assertEqual(restored.extra_headers, {'X-Tag': 'welcome'})
+        self.assertEqual(restored.alternatives, message.alternatives)
+        self.assertEqual(restored.attachments, message.attachments)
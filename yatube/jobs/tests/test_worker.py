@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Job
+from ..registry import enqueue, task
+from ..worker import Worker
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.record_batch', batch_size=10)
+def record_batch(payloads):
+    calls.append([payload['value'] for payload in payloads])
+
+
+@task('tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('Сбой')
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_priority_and_schedule(self):
+        """Сначала важные задачи, отложенные ждут своего времени."""
+        enqueue('tests.record', {'value': 'low'})
+        enqueue('tests.record', {'value': 'high'}, priority=10)
+        enqueue('tests.record', {'value': 'later'}, delay=60)
+
+        Worker().run(once=True)
+
+        self.assertEqual(calls, ['high', 'low'])
+        self.assertGreater(Job.objects.get().run_at, timezone.now())
+
+    def test_batch_handler_gets_all_payloads(self):
+        """Пакетный обработчик получает задачи одной пачкой."""
+        for value in range(3):
+            enqueue('tests.record_batch', {'value': value})
+
+        Worker().run(once=True)
+
+        self.assertEqual(calls, [[0, 1, 2]])
+        self.assertFalse(Job.objects.exists())
+
+    def test_retry_then_fail(self):
+        """Упавшая задача повторяется с задержкой, потом помечается."""
+        job = enqueue('tests.fail')
+        worker = Worker()
+
+        worker.run(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        worker.run(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('Сбой', job.last_error)
+
+    def test_stale_job_is_requeued(self):
+        """Задача упавшего воркера возвращается в очередь."""
+        enqueue('tests.record', {'value': 'stale'})
+        Job.objects.update(
+            status=Job.RUNNING,
+            locked_by='dead:1',
+            locked_at=timezone.now() - timedelta(days=1),
+        )
+
+        call_command('run_jobs', once=True)
+
+        self.assertEqual(calls, ['stale'])
+
+    def test_signup_sends_welcome_email_from_queue(self):
+        """Письмо после регистрации отправляет воркер, а не запрос."""
+        self.client.post(reverse('users:signup'), {
+            'username': 'newbie',
+            'email': 'newbie@example.com',
+            'password1': 'Sup3r-secret-pass',
+            'password2': 'Sup3r-secret-pass',
+        })
+        self.assertEqual(len(mail.outbox), 0)
+
+        Worker().run(once=True)
+
+        self.assertEqual(mail.outbox[0].to, ['newbie@example.com'])
@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .models import Job
+
+
+# Глубина очереди задач для мониторинга
+@staff_member_required
+def metrics(request):
+    return JsonResponse(Job.objects.stats())
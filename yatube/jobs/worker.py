@@ -0,0 +1,139 @@
+"""Воркер очереди задач.
+
+Воркер забирает задачи условным UPDATE ... WHERE status = 'queued',
+поэтому несколько процессов не возьмут одну задачу дважды и без
+SELECT FOR UPDATE (SQLite его не поддерживает). Задачи пакетного
+обработчика с одним именем берутся пачкой до batch_size штук.
+Упавшая задача возвращается в очередь с растущей задержкой, пока
+не кончатся попытки. Задачи, зависшие за упавшим воркером, через
+JOBS_LOCK_TIMEOUT секунд снова попадают в очередь.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import BatchError, registry
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(self, names=None, poll_interval=None):
+        self.names = names
+        self.poll_interval = (
+            settings.JOBS_POLL_INTERVAL
+            if poll_interval is None else poll_interval
+        )
+        self.id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+
+    def stop(self, *args):
+        """Завершает работу после текущей пачки задач."""
+        self.stopping.set()
+
+    def run(self, once=False):
+        """Выполняет задачи до остановки; once — пока очередь не пуста."""
+        while not self.stopping.is_set():
+            close_old_connections()
+            worked = self.run_batch()
+            if worked:
+                continue
+            if once:
+                return
+            self.stopping.wait(self.poll_interval)
+
+    def pending(self):
+        jobs = Job.objects.filter(
+            status=Job.QUEUED, run_at__lte=timezone.now()
+        )
+        if self.names:
+            jobs = jobs.filter(name__in=self.names)
+        return jobs
+
+    def requeue_stale(self):
+        deadline = timezone.now() - timedelta(
+            seconds=settings.JOBS_LOCK_TIMEOUT
+        )
+        return Job.objects.filter(
+            status=Job.RUNNING, locked_at__lt=deadline
+        ).update(status=Job.QUEUED, locked_by='', locked_at=None)
+
+    def claim(self):
+        """Берёт в работу следующую задачу или пачку задач одного типа."""
+        self.requeue_stale()
+        first = self.pending().first()
+        if first is None:
+            return None, []
+        task = registry.get(first.name)
+        if task is None:
+            Job.objects.filter(pk=first.pk).update(
+                status=Job.FAILED,
+                last_error=f'Неизвестная задача: {first.name}',
+            )
+            return None, []
+
+        ids = list(
+            self.pending().filter(name=first.name)
+            .values_list('pk', flat=True)[:task.batch_size or 1]
+        )
+        Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_by=self.id,
+            locked_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        # Другой воркер мог успеть забрать часть задач.
+        jobs = list(Job.objects.filter(
+            pk__in=ids, status=Job.RUNNING, locked_by=self.id
+        ))
+        return task, jobs
+
+    def run_batch(self):
+        """Выполняет одну пачку; False, если выполнять нечего."""
+        task, jobs = self.claim()
+        if not jobs:
+            # Пусто, либо задачи забрал другой воркер или они неизвестны.
+            return task is not None or self.pending().exists()
+        failed = []
+        try:
+            task([json.loads(job.payload) for job in jobs])
+        except BatchError as error:
+            logger.warning('Задача %s: %s', task.name, error)
+            failed = [jobs[index] for index in sorted(error.failed)]
+            self.retry(failed, str(error))
+        except Exception:
+            logger.exception('Задача %s упала', task.name)
+            failed = jobs
+            self.retry(failed, traceback.format_exc())
+        Job.objects.filter(
+            pk__in={job.pk for job in jobs} - {job.pk for job in failed}
+        ).delete()
+        return True
+
+    def retry(self, jobs, error):
+        now = timezone.now()
+        for job in jobs:
+            job.last_error = error
+            job.locked_by = ''
+            job.locked_at = None
+            if job.attempts >= job.max_attempts:
+                job.status = Job.FAILED
+            else:
+                job.status = Job.QUEUED
+                job.run_at = now + timedelta(
+                    seconds=settings.JOBS_RETRY_DELAY
+                    * 2 ** (job.attempts - 1)
+                )
+            job.save(update_fields=(
+                'status', 'run_at', 'last_error', 'locked_by', 'locked_at'
+            ))
@@ -1,5 +1,95 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+
+from .cache import bump_version, invalidate_post
 from .models import Post, Group, Follow, Comment
+from .utils import schedule_group_stats
+
+
+class ApproximateCountPaginator(Paginator):
+    """Пагинатор списка в админке без точного COUNT(*) на каждый запрос.
+
+    Для таблицы без фильтров в PostgreSQL берётся оценка из pg_class,
+    в остальных случаях точное значение кэшируется на
+    ADMIN_COUNT_CACHE_TIMEOUT секунд.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return int(row[0])
+
+        try:
+            query = str(queryset.query).encode()
+        except EmptyResultSet:
+            return 0
+        key = 'admin:count:' + hashlib.md5(query).hexdigest()
+        return cache.get_or_set(
+            key, queryset.count, settings.ADMIN_COUNT_CACHE_TIMEOUT
+        )
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Общие настройки списков для больших таблиц."""
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    date_hierarchy = 'pub_date'
+
+    def get_queryset(self, request):
+        # В список попадает только начало текста, а не весь TextField.
+        return super().get_queryset(request).annotate(
+            text_preview=Substr('text', 1, settings.ADMIN_TEXT_PREVIEW)
+        ).defer('text')
+
+    def get_list_display(self, request):
+        return tuple(
+            'text_preview' if name == 'text' else name
+            for name in super().get_list_display(request)
+        )
+
+    def text_preview(self, obj):
+        return obj.text_preview
+    text_preview.short_description = 'Текст'
+
+
+class SoftDeleteAdmin(admin.ModelAdmin):
+    """Список с помеченными удалёнными записями и их восстановлением."""
+    actions = ('restore',)
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def restore(self, request, queryset):
+        restored = list(queryset.filter(is_deleted=True))
+        self.model.all_objects.filter(
+            pk__in=[obj.pk for obj in restored]
+        ).update(is_deleted=False, deleted_at=None)
+        self.invalidate(restored)
+        self.message_user(request, f'Восстановлено записей: {len(restored)}')
+    restore.short_description = 'Восстановить удалённые'
+
+    def invalidate(self, restored):
+        """Сбрасывает кэши, в которые вернулись восстановленные записи."""
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -8,15 +98,44 @@ class GroupAdmin(admin.ModelAdmin):
     list_filter = ('slug',)
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin, SoftDeleteAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
+    search_fields = ('text',)
+    list_filter = ('pub_date', 'is_deleted')
+    empty_value_display = '-пусто-'
+
+    def invalidate(self, restored):
+        for post in restored:
+            invalidate_post(post)
+        schedule_group_stats(*{post.group_id for post in restored})
+
+
+class CommentAdmin(LargeTableAdmin, SoftDeleteAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'post',)
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('is_deleted',)
     empty_value_display = '-пусто-'
 
+    def invalidate(self, restored):
+        for post_id in {comment.post_id for comment in restored}:
+            bump_version(f'post:{post_id}')
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author',)
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
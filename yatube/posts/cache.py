@@ -0,0 +1,88 @@
+"""Версии наборов ключей кэша для лент и постов.
+
+Ключ закэшированного ответа включает версии всех лент, от которых он
+зависит. Когда лента меняется, её версия увеличивается, и старые ключи
+просто перестают запрашиваться, а потом вытесняются кэшем.
+
+Наборы:
+    posts — любые изменения постов (главная и лента подписок);
+    archive — запуск archive_posts;
+    group:<id>, author:<id> — посты группы и автора;
+    post:<id> — пост и его комментарии;
+    follow:<user_id> — подписки пользователя;
+    groups — список групп.
+
+Те же версии входят в ключи {% cache %} общих частей страниц: список
+постов или комментариев один на всех, а шапка, кнопка подписки,
+форма с CSRF-токеном рисуются для каждого пользователя заново.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'posts:version:{}'
+
+# Счётчики хранятся в отдельном кэше с атомарным incr (CACHES).
+VERSIONS_CACHE = 'versions'
+
+
+def initial_version():
+    # Номер начинается со времени: если счётчик вытеснен или сброшен,
+    # новый не совпадёт с номерами, под которыми уже лежат данные.
+    return int(time.time() * 1000)
+
+
+def get_version(name):
+    """Текущая версия именованного набора ключей кэша."""
+    return caches[VERSIONS_CACHE].get_or_set(
+        VERSION_KEY.format(name), initial_version, None
+    )
+
+
+def get_versions(*names):
+    """Версии нескольких наборов одной строкой для ключа кэша.
+
+    Строка состоит из пар имя=версия, поэтому ключи разных наборов
+    с совпавшими номерами версий не пересекаются.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    found = caches[VERSIONS_CACHE].get_many(keys)
+    for name, key in zip(names, keys):
+        if key not in found:
+            found[key] = get_version(name)
+    return ','.join(
+        '{}={}'.format(name, found[key]) for name, key in zip(names, keys)
+    )
+
+
+def fragment_context(*names):
+    """Контекст для {% cache %} общих фрагментов, зависящих от наборов."""
+    return {
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+        'fragment_version': get_versions(*names),
+    }
+
+
+def bump_version(name):
+    """Делает устаревшими все ключи набора, не перебирая их."""
+    versions = caches[VERSIONS_CACHE]
+    key = VERSION_KEY.format(name)
+    try:
+        return versions.incr(key)
+    except ValueError:
+        versions.add(key, initial_version(), None)
+        return versions.incr(key)
+
+
+def post_feeds(post):
+    """Наборы, которые меняются вместе с постом."""
+    feeds = ['posts', f'author:{post.author_id}', f'post:{post.pk}']
+    if post.group_id:
+        feeds.append(f'group:{post.group_id}')
+    return feeds
+
+
+def invalidate_post(post):
+    for name in post_feeds(post):
+        bump_version(name)
@@ -0,0 +1,233 @@
+"""Отложенная запись комментариев пачками.
+
+Проверенные комментарии сначала дописываются в журнал на диске
+(с fsync), и только потом попадают в память процесса. В базу они
+уходят одним bulk_create, когда набирается COMMENT_BUFFER_SIZE штук
+или проходит COMMENT_BUFFER_INTERVAL секунд. Журнал процесса очищается
+после успешной записи, поэтому при падении воркера комментарии не
+теряются: их дозапишет команда flush_comments.
+Гарантия доставки — «как минимум один раз».
+
+Ещё не записанные комментарии автора видны ему на странице поста с
+любого воркера: каждый текст лежит в общем кэше под своим номером, а
+номера для поста и автора выдаёт атомарный счётчик (add/incr). После
+записи в базу удаляются только номера записанных комментариев, чужие
+остаются.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+
+from .cache import bump_version
+from .models import ArchivedPost, Comment, Post
+from .utils import archive_comments
+
+JOURNAL_PATTERN = 'comments-*.jsonl'
+
+PENDING_COUNT_KEY = 'posts:pending_comments:{}:{}'
+PENDING_KEY = 'posts:pending_comments:{}:{}:{}'
+# Журнал упавшего воркера дозаписывается вручную, ключ не должен
+# показывать комментарии дольше этого срока.
+PENDING_TIMEOUT = 60 * 10
+# Счётчик живёт дольше любого своего номера, поэтому занятый номер
+# не выдаётся повторно.
+PENDING_COUNT_TIMEOUT = PENDING_TIMEOUT * 2
+
+logger = logging.getLogger(__name__)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_journal(path):
+    records = []
+    with open(path, encoding='utf-8') as journal:
+        for line in journal:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Строка могла оборваться при падении процесса.
+                continue
+    return records
+
+
+def _pending_key(record):
+    return PENDING_KEY.format(
+        record['post_id'], record['author_id'], record['slot']
+    )
+
+
+def _reserve_slot(post_id, author_id):
+    """Выдаёт следующий номер отложенного комментария автора к посту."""
+    key = PENDING_COUNT_KEY.format(post_id, author_id)
+    while True:
+        cache.add(key, 0, PENDING_COUNT_TIMEOUT)
+        try:
+            slot = cache.incr(key)
+        except ValueError:
+            # Счётчик истёк между add и incr.
+            continue
+        cache.touch(key, PENDING_COUNT_TIMEOUT)
+        return slot
+
+
+def _write_comments(records):
+    # Пост могли удалить или перенести в архив, пока комментарий ждал.
+    wanted = {record['post_id'] for record in records}
+    post_ids = set(
+        Post.objects.filter(pk__in=wanted).values_list('pk', flat=True)
+    )
+    archived_ids = set(ArchivedPost.objects.filter(
+        pk__in=wanted - post_ids
+    ).values_list('pk', flat=True))
+    comments, late_comments, dropped = [], [], 0
+    for record in records:
+        comment = Comment(
+            post_id=record['post_id'],
+            author_id=record['author_id'],
+            text=record['text'],
+        )
+        if record['post_id'] in post_ids:
+            comments.append(comment)
+        elif record['post_id'] in archived_ids:
+            late_comments.append(comment)
+        else:
+            dropped += 1
+    if dropped:
+        logger.warning(
+            'Пропущено комментариев к удалённым постам: %s', dropped
+        )
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+        # Комментарий к архивному посту получает pk в горячей таблице и
+        # переносится тем же путём, что и в archive_posts. Внешний ключ
+        # на пост проверяется при фиксации, когда строки уже нет.
+        for comment in late_comments:
+            comment.save()
+        archive_comments(late_comments)
+    cache.delete_many({_pending_key(record) for record in records})
+    for post_id in post_ids | archived_ids:
+        bump_version(f'post:{post_id}')
+
+
+class CommentBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    @property
+    def journal_path(self):
+        return os.path.join(
+            settings.COMMENT_BUFFER_DIR, f'comments-{os.getpid()}.jsonl'
+        )
+
+    def add(self, comment):
+        """Принимает несохранённый комментарий в очередь на запись."""
+        record = {
+            'post_id': comment.post_id,
+            'author_id': comment.author_id,
+            'text': comment.text,
+            'slot': _reserve_slot(comment.post_id, comment.author_id),
+        }
+        with self._lock:
+            self._append_to_journal(record)
+            self._pending.append(record)
+            cache.set(_pending_key(record), record['text'], PENDING_TIMEOUT)
+            if len(self._pending) >= settings.COMMENT_BUFFER_SIZE:
+                try:
+                    self._flush_locked()
+                    return
+                except DatabaseError:
+                    # Комментарий уже в журнале, повторим по таймеру.
+                    logger.exception('Не удалось записать комментарии')
+            if self._timer is None:
+                self._timer = threading.Timer(
+                    settings.COMMENT_BUFFER_INTERVAL, self._flush_on_timer
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+    def pending_for(self, post_id, author_id):
+        """Ещё не записанные тексты комментариев автора к посту."""
+        count = cache.get(PENDING_COUNT_KEY.format(post_id, author_id), 0)
+        keys = [
+            PENDING_KEY.format(post_id, author_id, slot)
+            for slot in range(1, count + 1)
+        ]
+        texts = cache.get_many(keys)
+        return [texts[key] for key in keys if key in texts]
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        _write_comments(self._pending)
+        self._pending = []
+        os.remove(self.journal_path)
+
+    def _flush_on_timer(self):
+        try:
+            with self._lock:
+                self._timer = None
+                self._flush_locked()
+        except DatabaseError:
+            logger.exception('Не удалось записать комментарии')
+        finally:
+            connection.close()
+
+    def _append_to_journal(self, record):
+        os.makedirs(settings.COMMENT_BUFFER_DIR, exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+
+
+def replay_journals():
+    """Дозаписывает журналы завершившихся процессов.
+
+    Журнал забирается переименованием, поэтому один и тот же файл
+    не обработают два процесса сразу. Возвращает число комментариев.
+    """
+    pattern = os.path.join(settings.COMMENT_BUFFER_DIR, JOURNAL_PATTERN)
+    replayed = 0
+    for path in glob.glob(pattern):
+        pid = int(os.path.basename(path)[len('comments-'):-len('.jsonl')])
+        if pid == os.getpid() or _process_alive(pid):
+            continue
+        claimed = f'{path}.replay-{os.getpid()}'
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            continue
+        records = _read_journal(claimed)
+        if records:
+            _write_comments(records)
+        os.remove(claimed)
+        replayed += len(records)
+    return replayed
+
+
+comment_buffer = CommentBuffer()
+atexit.register(comment_buffer.flush)
@@ -0,0 +1,134 @@
+"""Потоковая выгрузка постов, комментариев и подписок.
+
+Строки читаются из базы итератором по EXPORT_CHUNK_SIZE штук и сразу
+превращаются в NDJSON или CSV, так что расход памяти не зависит от
+объёма выгрузки. Формат follows совпадает с входом import_follows.
+"""
+import csv
+import zlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Post
+)
+
+FORMATS = ('ndjson', 'csv')
+
+# Набор -> (модели, столбец -> поле для values_list, есть ли дата)
+EXPORTS = {
+    'posts': (
+        (Post, ArchivedPost),
+        {
+            'id': 'id',
+            'text': 'text',
+            'pub_date': 'pub_date',
+            'author': 'author__username',
+            'group': 'group__slug',
+            'image': 'image',
+        },
+        True,
+    ),
+    'comments': (
+        (Comment, ArchivedComment),
+        {
+            'id': 'id',
+            'post': 'post_id',
+            'author': 'author__username',
+            'text': 'text',
+            'pub_date': 'pub_date',
+        },
+        True,
+    ),
+    'follows': (
+        (Follow,),
+        {
+            'follower': 'user__username',
+            'author': 'author__username',
+        },
+        False,
+    ),
+}
+
+# Дополнительные условия выборки: комментарии к постам, помеченным
+# удалёнными, в выгрузку не попадают.
+FILTERS = {
+    Comment: {'post__is_deleted': False},
+}
+
+
+def parse_moment(value):
+    """Разбирает дату или дату со временем из строки, None — без границы."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        moment = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def iter_rows(kind, since=None, until=None):
+    """Строки выгрузки в виде кортежей, упорядоченные по id."""
+    models, columns, dated = EXPORTS[kind]
+    for model in models:
+        queryset = model.objects.filter(
+            **FILTERS.get(model, {})
+        ).order_by('pk')
+        if dated and since is not None:
+            queryset = queryset.filter(pub_date__gte=since)
+        if dated and until is not None:
+            queryset = queryset.filter(pub_date__lt=until)
+        yield from queryset.values_list(*columns.values()).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE
+        )
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+    def write(self, value):
+        return value
+
+
+def render_ndjson(kind, rows):
+    names = list(EXPORTS[kind][1])
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def render_csv(kind, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(list(EXPORTS[kind][1]))
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        ])
+
+
+def gzip_stream(chunks):
+    """Сжимает поток строк в gzip на лету."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(kind, fmt='ndjson', since=None, until=None, gzip=False):
+    rows = iter_rows(kind, since, until)
+    render = render_csv if fmt == 'csv' else render_ndjson
+    chunks = render(kind, rows)
+    if gzip:
+        return gzip_stream(chunks)
+    return (chunk.encode() for chunk in chunks)
@@ -0,0 +1,116 @@
+"""RSS и Atom ленты групп и авторов.
+
+Готовый XML хранится в кэше под версией ленты из posts.cache и
+отдаётся с ETag и Last-Modified, поэтому частый опрос обходится
+одним чтением кэша, а клиенты с условными заголовками получают 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+
+from .cache import get_versions
+from .utils import get_author_or_404, get_group_or_404
+
+
+class PostsFeed(Feed):
+    def items(self, obj):
+        return obj.posts.select_related('author')[:settings.FEED_ITEMS]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupFeed(PostsFeed):
+    version_prefix = 'group'
+
+    def get_object(self, request, slug):
+        return get_group_or_404(slug)
+
+    def title(self, obj):
+        return obj.title
+
+    def link(self, obj):
+        return reverse('posts:group_posts', kwargs={'slug': obj.slug})
+
+    def description(self, obj):
+        return obj.description
+
+
+class AuthorFeed(PostsFeed):
+    version_prefix = 'author'
+
+    def get_object(self, request, username):
+        return get_author_or_404(username)
+
+    def title(self, obj):
+        return f'Посты пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', kwargs={'username': obj.username})
+
+    def description(self, obj):
+        return self.title(obj)
+
+
+class AtomGroupFeed(GroupFeed):
+    feed_type = Atom1Feed
+    subtitle = GroupFeed.description
+
+
+class AtomAuthorFeed(AuthorFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorFeed.description
+
+
+def cached_feed(feed_class):
+    """Оборачивает ленту в кэш с поддержкой условных запросов."""
+    feed = feed_class()
+
+    def view(request, **kwargs):
+        obj = feed.get_object(request, **kwargs)
+        version = get_versions(f'{feed.version_prefix}:{obj.pk}')
+        key = f'posts:feed:{feed_class.__name__}:{obj.pk}:{version}'
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, **kwargs)
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'last_modified': response.get('Last-Modified'),
+                'etag': quote_etag(hashlib.md5(key.encode()).hexdigest()),
+            }
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+
+        last_modified = parse_http_date_safe(cached['last_modified'] or '')
+        response = get_conditional_response(
+            request, etag=cached['etag'], last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(
+                cached['content'], content_type=cached['content_type']
+            )
+        response['ETag'] = cached['etag']
+        if cached['last_modified']:
+            response['Last-Modified'] = cached['last_modified']
+        return response
+
+    return view
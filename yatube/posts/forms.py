@@ -1,8 +1,15 @@
 from django.forms import ModelForm
 from .models import Post, Comment
+from .utils import group_choices
 
 
 class PostForm(ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Группы берутся из кэша, а не читаются из базы при каждом показе.
+        field = self.fields['group']
+        field.choices = [('', field.empty_label)] + group_choices()
+
     class Meta:
         model = Post
 
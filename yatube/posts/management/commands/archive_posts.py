@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts.cache import bump_version
+from posts.models import ArchivedPost, Comment, Post
+from posts.utils import archive_comments
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше заданного возраста вместе с комментариями '
+        'в архивные таблицы, чтобы горячая таблица оставалась маленькой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше N дней',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ARCHIVE_BATCH_SIZE,
+            help='Сколько постов переносить в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        old_posts = Post.objects.filter(pub_date__lt=cutoff).order_by('pk')
+        archived = 0
+        while True:
+            with transaction.atomic():
+                posts = list(old_posts[:options['batch_size']])
+                if not posts:
+                    break
+                self.archive(posts)
+            archived += len(posts)
+
+        if archived:
+            bump_version('archive')
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив постов: {archived}'
+        ))
+
+    @staticmethod
+    def archive(posts):
+        post_ids = [post.pk for post in posts]
+        ArchivedPost.objects.bulk_create([
+            ArchivedPost(
+                pk=post.pk,
+                text=post.text,
+                pub_date=post.pub_date,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+            )
+            for post in posts
+        ])
+        archive_comments(Comment.objects.filter(post_id__in=post_ids))
+        Comment.all_objects.filter(post_id__in=post_ids).delete()
+        Post.all_objects.filter(pk__in=post_ids).delete()
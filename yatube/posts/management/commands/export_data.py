@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORTS, FORMATS, export_stream, parse_moment
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты, комментарии или подписки '
+        'в NDJSON или CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--since', help='Начало периода (включительно)')
+        parser.add_argument('--until', help='Конец периода (не включая)')
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать вывод в gzip'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_moment(options['since'])
+            until = parse_moment(options['until'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        chunks = export_stream(
+            options['kind'], options['format'], since, until, options['gzip']
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
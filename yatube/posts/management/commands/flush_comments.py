@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.comment_buffer import replay_journals
+
+
+class Command(BaseCommand):
+    help = (
+        'Записывает в базу комментарии из журналов отложенной записи, '
+        'оставшихся после завершившихся процессов.'
+    )
+
+    def handle(self, *args, **options):
+        replayed = replay_journals()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано комментариев из журналов: {replayed}'
+        ))
@@ -0,0 +1,343 @@
+import csv
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from posts.cache import bump_version
+from posts.export import FORMATS, parse_moment
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Post
+)
+from posts.utils import (
+    archive_comments, chunked, refresh_group_stats, resolve_ids
+)
+
+User = get_user_model()
+
+
+def open_source(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_records(source, fmt):
+    if fmt == 'csv':
+        return csv.DictReader(source)
+    return (json.loads(line) for line in source if line.strip())
+
+
+class KeepDatesQuerySet(models.QuerySet):
+    """bulk_create, который пишет pub_date из объектов как есть.
+
+    Вставка идёт в режиме raw, как у loaddata: pre_save полей не
+    вызывается, и auto_now_add не подменяет дату из файла. Общие для
+    всех потоков объекты полей модели при этом не меняются.
+    """
+    def _insert(self, *args, **kwargs):
+        kwargs['raw'] = True
+        return super()._insert(*args, **kwargs)
+
+
+def parse_id(value):
+    """Целый id из строки файла, None — если его нет или он неверный."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты или комментарии из NDJSON/CSV (в том числе .gz) '
+        'пачками bulk_create. Формат совпадает с выгрузкой export_data. '
+        'После сбоя продолжает с последней сохранённой пачки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=('posts', 'comments'))
+        parser.add_argument('path', help='Файл с данными')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла, по умолчанию — по расширению',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE,
+            help='Сколько строк вставлять в одной транзакции',
+        )
+        parser.add_argument(
+            '--images-dir',
+            help='Каталог, относительно которого указаны картинки постов',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Сколько картинок копировать параллельно',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с прогрессом, по умолчанию <path>.checkpoint',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if '.csv' in os.path.basename(path) else 'ndjson'
+        )
+        self.options = options
+        self.user_ids = {}
+        self.group_ids = {}
+        self.touched = set()
+        self.touched_groups = set()
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        done = self.read_checkpoint(checkpoint)
+        imported = skipped = 0
+        model = Post if options['kind'] == 'posts' else Comment
+        insert = (
+            self.insert_posts if model is Post else self.insert_comments
+        )
+
+        try:
+            source = open_source(path)
+        except OSError as error:
+            raise CommandError(error)
+
+        with source:
+            records = islice(read_records(source, fmt), done, None)
+            for chunk in chunked(records, options['batch_size']):
+                self.line = done
+                self.copied = []
+                try:
+                    with transaction.atomic():
+                        inserted = insert(chunk)
+                except BaseException:
+                    # Пачка не записана: её картинки не нужны, а при
+                    # повторном запуске скопируются заново.
+                    for image in self.copied:
+                        default_storage.delete(image)
+                    raise
+                done += len(chunk)
+                imported += inserted
+                skipped += len(chunk) - inserted
+                self.write_checkpoint(checkpoint, done)
+
+        self.rebuild()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: {imported}, пропущено строк: {skipped}'
+        ))
+
+    def insert_posts(self, chunk):
+        resolve_ids(
+            User.objects, 'username',
+            [row.get('author') for row in chunk], self.user_ids,
+        )
+        resolve_ids(
+            Group.objects, 'slug',
+            [row.get('group') for row in chunk], self.group_ids,
+        )
+        ids = {
+            number: parse_id(row['id'])
+            for number, row in enumerate(chunk) if row.get('id')
+        }
+        # Посты, записанные до сбоя, пропускаются до копирования картинок.
+        existing = set()
+        for model in (Post.all_objects, ArchivedPost.objects):
+            existing.update(model.filter(
+                pk__in=set(ids.values()) - {None}
+            ).values_list('pk', flat=True))
+        rows = []
+        for number, row in enumerate(chunk):
+            pk = ids.get(number)
+            if number in ids and pk is None:
+                self.report(number, 'неверный id')
+            elif not row.get('text'):
+                self.report(number, 'нет текста')
+            elif pk in existing or row.get('author') not in self.user_ids:
+                continue
+            else:
+                rows.append((row, pk))
+                if pk is not None:
+                    existing.add(pk)
+
+        images = self.copy_images([row.get('image') for row, _ in rows])
+        posts = []
+        for (row, pk), image in zip(rows, images):
+            post = Post(
+                pk=pk,
+                text=row['text'],
+                author_id=self.user_ids[row['author']],
+                group_id=self.group_ids.get(row.get('group')),
+                image=image,
+                pub_date=self.pub_date(row),
+            )
+            posts.append(post)
+            self.touched.add(f'author:{post.author_id}')
+            if post.group_id:
+                self.touched.add(f'group:{post.group_id}')
+                self.touched_groups.add(post.group_id)
+        KeepDatesQuerySet(Post).bulk_create(
+            posts, batch_size=self.options['batch_size']
+        )
+        return len(posts)
+
+    def insert_comments(self, chunk):
+        resolve_ids(
+            User.objects, 'username',
+            [row.get('author') for row in chunk], self.user_ids,
+        )
+        parsed = [
+            self.parse_comment(number, row)
+            for number, row in enumerate(chunk)
+        ]
+        parsed = [comment for comment in parsed if comment is not None]
+        wanted = {comment.post_id for comment in parsed}
+        post_ids = set(
+            Post.objects.filter(pk__in=wanted).values_list('pk', flat=True)
+        )
+        archived_ids = set(ArchivedPost.objects.filter(
+            pk__in=wanted - post_ids
+        ).values_list('pk', flat=True))
+        # Комментарии, записанные до сбоя, узнаются по id или, если его
+        # нет, по посту, автору, дате и тексту.
+        existing = self.existing_comments(parsed)
+        comments, late_comments = [], []
+        for comment in parsed:
+            key = comment.pk or self.comment_key(comment)
+            if key in existing:
+                continue
+            existing.add(key)
+            if comment.post_id in post_ids:
+                comments.append(comment)
+            elif comment.post_id in archived_ids:
+                late_comments.append(comment)
+        KeepDatesQuerySet(Comment).bulk_create(
+            comments, batch_size=self.options['batch_size']
+        )
+        # Комментарии к архивным постам получают pk в горячей таблице и
+        # переносятся как в archive_posts, чтобы не занять чужой pk.
+        for comment in late_comments:
+            comment.save_base(raw=True, force_insert=True)
+        archive_comments(late_comments)
+        for comment in comments + late_comments:
+            self.touched.add(f'post:{comment.post_id}')
+        return len(comments) + len(late_comments)
+
+    def parse_comment(self, number, row):
+        """Несохранённый комментарий из строки, None — если строка плохая."""
+        pk = parse_id(row.get('id'))
+        post_id = parse_id(row.get('post'))
+        if row.get('id') and pk is None:
+            self.report(number, 'неверный id')
+        elif post_id is None:
+            self.report(number, 'неверный post')
+        elif not row.get('text'):
+            self.report(number, 'нет текста')
+        elif row.get('author') in self.user_ids:
+            return Comment(
+                pk=pk,
+                post_id=post_id,
+                author_id=self.user_ids[row['author']],
+                text=row['text'],
+                pub_date=self.pub_date(row),
+            )
+        return None
+
+    @staticmethod
+    def comment_key(comment):
+        return (
+            comment.post_id, comment.author_id, comment.pub_date,
+            comment.text,
+        )
+
+    def existing_comments(self, comments):
+        """pk и ключи уже записанных комментариев, например до сбоя."""
+        ids = {comment.pk for comment in comments} - {None}
+        post_ids = {comment.post_id for comment in comments}
+        dates = {comment.pub_date for comment in comments}
+        existing = set()
+        for model in (Comment.all_objects, ArchivedComment.objects):
+            existing.update(
+                model.filter(pk__in=ids).values_list('pk', flat=True)
+            )
+            existing.update(
+                self.comment_key(comment)
+                for comment in model.filter(
+                    post_id__in=post_ids, pub_date__in=dates
+                ).only('post_id', 'author_id', 'pub_date', 'text')
+            )
+        return existing
+
+    def report(self, number, problem):
+        self.stderr.write(
+            f'Строка {self.line + number + 1} пропущена: {problem}'
+        )
+
+    def copy_images(self, names):
+        """Копирует картинки пачки в хранилище в несколько потоков."""
+        images_dir = self.options['images_dir']
+        if not images_dir:
+            # Картинки уже лежат в хранилище под теми же именами.
+            return [name or '' for name in names]
+
+        def copy(name):
+            if not name:
+                return ''
+            with open(os.path.join(images_dir, name), 'rb') as image:
+                return default_storage.save(
+                    os.path.join('posts', os.path.basename(name)),
+                    File(image),
+                )
+
+        with ThreadPoolExecutor(self.options['workers']) as executor:
+            images = list(executor.map(copy, names))
+        self.copied = [image for image in images if image]
+        return images
+
+    @staticmethod
+    def pub_date(row):
+        return parse_moment(row.get('pub_date')) or timezone.now()
+
+    def rebuild(self):
+        """Один раз сбрасывает кэши лент, затронутых импортом."""
+        if self.options['kind'] == 'posts':
+            self.touched.add('posts')
+        for name in self.touched:
+            bump_version(name)
+        # bulk_create не шлёт сигналов, статистику групп считаем здесь.
+        refresh_group_stats(self.touched_groups)
+        # Строки с явными id не двигают последовательность в PostgreSQL.
+        model = Post if self.options['kind'] == 'posts' else Comment
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [model]
+            ):
+                cursor.execute(sql)
+
+    @staticmethod
+    def read_checkpoint(path):
+        try:
+            with open(path) as checkpoint:
+                return int(checkpoint.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def write_checkpoint(path, done):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as checkpoint:
+            checkpoint.write(str(done))
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,55 @@
+import csv
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.utils import bulk_follow, chunked, resolve_ids
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует граф подписок из CSV-файла со столбцами '
+        '"follower,author" (имена пользователей).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к CSV-файлу')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.FOLLOW_BATCH_SIZE,
+            help='Сколько подписок вставлять за один запрос',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_ids = {}
+        sent = skipped = 0
+
+        try:
+            source = open(options['path'], newline='', encoding='utf-8')
+        except OSError as error:
+            raise CommandError(error)
+
+        with source:
+            rows = csv.DictReader(source)
+            for chunk in chunked(rows, batch_size):
+                names = [row['follower'] for row in chunk]
+                names += [row['author'] for row in chunk]
+                resolve_ids(User.objects, 'username', names, user_ids)
+                edges = []
+                for row in chunk:
+                    user_id = user_ids.get(row['follower'])
+                    author_id = user_ids.get(row['author'])
+                    if user_id is None or author_id is None:
+                        skipped += 1
+                        continue
+                    edges.append((user_id, author_id))
+                sent += bulk_follow(edges, batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено подписок: {sent}, пропущено строк: {skipped}'
+        ))
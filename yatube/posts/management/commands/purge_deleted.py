@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_image
+
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Окончательно удаляет помеченные удалёнными посты и комментарии '
+        'небольшими пачками, вместе с картинками и миниатюрами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.PURGE_BATCH_SIZE,
+            help='Сколько строк удалять в одной транзакции',
+        )
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=0,
+            help='Удалять только то, что помечено больше N минут назад',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+
+        comments = self.purge_comments(Comment.all_objects.filter(
+            is_deleted=True, deleted_at__lte=cutoff
+        ))
+        posts = 0
+        deleted_posts = Post.all_objects.filter(
+            is_deleted=True, deleted_at__lte=cutoff
+        )
+        while True:
+            batch = list(
+                deleted_posts.values_list('pk', 'image')[:self.batch_size]
+            )
+            if not batch:
+                break
+            post_ids = [pk for pk, _ in batch]
+            comments += self.purge_comments(
+                Comment.all_objects.filter(post_id__in=post_ids)
+            )
+            with transaction.atomic():
+                Post.all_objects.filter(pk__in=post_ids).delete()
+            for _, image in batch:
+                if image:
+                    delete_image(image)
+            posts += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено постов: {posts}, комментариев: {comments}'
+        ))
+
+    def purge_comments(self, queryset):
+        purged = 0
+        while True:
+            batch = list(
+                queryset.values_list('pk', flat=True)[:self.batch_size]
+            )
+            if not batch:
+                return purged
+            with transaction.atomic():
+                Comment.all_objects.filter(pk__in=batch).delete()
+            purged += len(batch)
@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-19 13:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    stats = {
+        pk: GroupStats(group_id=pk)
+        for pk in Group.objects.values_list('pk', flat=True)
+    }
+    for model_name, filters in (
+        ('Post', {'is_deleted': False}), ('ArchivedPost', {}),
+    ):
+        rows = (
+            apps.get_model('posts', model_name).objects
+            .filter(group__isnull=False, **filters)
+            .values('group_id')
+            .annotate(count=models.Count('id'), last=models.Max('pub_date'))
+            .order_by()
+        )
+        for row in rows:
+            group_stats = stats[row['group_id']]
+            group_stats.posts_count += row['count']
+            if (group_stats.last_post_at is None
+                    or row['last'] > group_stats.last_post_at):
+                group_stats.last_post_at = row['last']
+    GroupStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('last_post_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='group',
+            name='title',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -2,13 +2,13 @@ from django.db import models
 from django.contrib.auth import get_user_model
 
 from yatube.settings import POST_SYMBOLS, COMMENT_SYMBOLS
-from core.models import CreatedModel
+from core.models import CreatedModel, SoftDeleteModel
 
 User = get_user_model()
 
 
 class Group(models.Model):
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, db_index=True)
     slug = models.SlugField(unique=True)
     description = models.TextField(max_length=200, blank=True)
 
@@ -19,12 +19,28 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class GroupStats(models.Model):
+    """Число постов группы и время последнего из них.
+
+    Пересчитывается задачей posts.refresh_group_stats только для
+    групп, в которых что-то изменилось.
+    """
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    last_post_at = models.DateTimeField(null=True, blank=True)
+
+
+class Post(SoftDeleteModel):
     text = models.TextField(
         verbose_name='Текст',
         help_text='Добавьте текст новой записи'
     )
-    pub_date = models.DateTimeField(auto_now_add=True)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -44,6 +60,8 @@ class Post(models.Model):
         blank=True
     )
 
+    is_archived = False
+
     class Meta:
         ordering = ['-pub_date']
 
@@ -51,7 +69,7 @@ class Post(models.Model):
         return self.text[:POST_SYMBOLS]
 
 
-class Comment(CreatedModel):
+class Comment(CreatedModel, SoftDeleteModel):
     post = models.ForeignKey(
         Post,
         verbose_name='Пост',
@@ -93,6 +111,75 @@ class Follow(models.Model):
     class Meta:
         verbose_name_plural = 'Подписки'
         verbose_name = 'Подписка'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_following'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='prevent_self_follow'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user} подписался на {self.author}'
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый из горячей таблицы командой archive_posts.
+
+    Первичный ключ сохраняется, поэтому ссылки на пост не меняются.
+    """
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        blank=True, null=True,
+        verbose_name='Группа',
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name_plural = 'Архив постов'
+        verbose_name = 'Архивный пост'
+
+    def __str__(self):
+        return self.text[:POST_SYMBOLS]
+
+
+class ArchivedComment(models.Model):
+    post = models.ForeignKey(
+        ArchivedPost,
+        verbose_name='Пост',
+        related_name='comment',
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        related_name='archived_comments',
+        on_delete=models.CASCADE
+    )
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField('Дата создания')
+
+    class Meta:
+        ordering = ['-pub_date', ]
+
+    def __str__(self):
+        return self.text[:COMMENT_SYMBOLS]
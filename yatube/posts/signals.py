@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from jobs.registry import enqueue
+from .cache import bump_version, invalidate_post
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Group, Post
+)
+from .utils import AUTHOR_KEY, GROUP_KEY, lookup_key, schedule_group_stats
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # При смене группы устаревает и лента прежней группы.
+    instance._loaded_group_id = instance.group_id
+    # Отложенное поле не дочитываем, как и username ниже.
+    instance._loaded_image = str(instance.__dict__.get('image') or '')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    invalidate_post(instance)
+    loaded_group_id = getattr(instance, '_loaded_group_id', None)
+    if loaded_group_id and loaded_group_id != instance.group_id:
+        bump_version(f'group:{loaded_group_id}')
+    # Пост создан, удалён или перенесён в другую группу.
+    if kwargs.get('created', True) or loaded_group_id != instance.group_id:
+        schedule_group_stats(instance.group_id, loaded_group_id)
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=ArchivedPost)
+@receiver(post_delete, sender=ArchivedPost)
+def archived_post_changed(sender, instance, **kwargs):
+    # Размер архивной части лент кэшируется по версии archive.
+    bump_version('archive')
+    invalidate_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, created, **kwargs):
+    # Превью готовятся только для новой картинки, а не при каждом
+    # сохранении поста.
+    image = instance.image.name or ''
+    changed = created or image != instance._loaded_image
+    instance._loaded_image = image
+    if image and changed and not kwargs.get('raw'):
+        enqueue('posts.make_thumbnails', {'post_id': instance.pk})
+
+
+@receiver(post_init, sender=Group)
+def remember_slug(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_version('groups')
+    if kwargs.get('signal') is post_delete:
+        # Архивные посты группы остались без неё: размеры лент устарели.
+        bump_version('archive')
+    # Сбрасываем и прежний slug, и закэшированный ранее 404 для нового.
+    cache.delete_many({
+        lookup_key(GROUP_KEY, instance.slug),
+        lookup_key(GROUP_KEY, instance._loaded_slug),
+    })
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    # Отложенное поле не дочитываем: post_init срабатывает на каждую выборку.
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def author_changed(sender, instance, **kwargs):
+    cache.delete_many({
+        lookup_key(AUTHOR_KEY, instance.username),
+        lookup_key(AUTHOR_KEY, instance._loaded_username),
+    })
+    instance._loaded_username = instance.username
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=ArchivedComment)
+@receiver(post_delete, sender=ArchivedComment)
+def comment_changed(sender, instance, **kwargs):
+    bump_version(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    bump_version(f'follow:{instance.user_id}')
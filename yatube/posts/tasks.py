@@ -0,0 +1,34 @@
+from jobs.registry import task
+from .models import Post
+from .utils import refresh_group_stats
+
+# Размеры превью из includes/article.html и posts/post_detail.html
+THUMBNAILS = ('660x159', '960x339')
+
+
+@task('posts.make_thumbnails', batch_size=50)
+def make_thumbnails(payloads):
+    """Заранее готовит превью картинок, чтобы не делать это в запросе."""
+    # sorl импортируется при первой задаче, а не при запуске воркера.
+    from sorl.thumbnail import get_thumbnail
+
+    posts = Post.objects.filter(
+        pk__in=[payload['post_id'] for payload in payloads]
+    ).exclude(image='')
+    for post in posts:
+        for geometry in THUMBNAILS:
+            get_thumbnail(post.image, geometry, crop='center', upscale=True)
+
+
+@task('posts.refresh_group_stats', batch_size=100)
+def refresh_stats(payloads):
+    refresh_group_stats(payload['group_id'] for payload in payloads)
+
+
+@task('posts.delete_images', batch_size=100)
+def delete_images(payloads):
+    """Удаляет файлы картинок вместе с их превью."""
+    from sorl.thumbnail import delete
+
+    for payload in payloads:
+        delete(payload['image'])
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(ADMIN_TEXT_PREVIEW=10)
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.post = Post.objects.create(
+            author=cls.admin, text='Начало текста и очень длинный хвост'
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.admin, text='Комментарий с хвостом'
+        )
+        Follow.objects.create(
+            user=User.objects.create_user(username='reader'),
+            author=cls.admin,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(AdminChangelistTests.admin)
+
+    def test_changelists_show_text_preview(self):
+        """Списки в админке открываются и выводят только начало текста."""
+        urls = {
+            reverse('admin:posts_post_changelist'): 'длинный хвост',
+            reverse('admin:posts_comment_changelist'): 'с хвостом',
+            reverse('admin:posts_follow_changelist'): None,
+        }
+        for url, tail in urls.items():
+            with self.subTest(url=url):
+                response = self.admin_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                if tail:
+                    self.assertNotContains(response, tail)
+
+    def test_changelist_count_is_cached(self):
+        """Повторный запрос списка не считает строки заново."""
+        url = reverse('admin:posts_post_changelist')
+        self.admin_client.get(url)
+        Post.objects.create(author=self.admin, text='Ещё один пост')
+
+        response = self.admin_client.get(url)
+
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_deleted_posts_listed_and_restored(self):
+        """Удалённый пост виден в админке и восстанавливается действием."""
+        post = Post.objects.create(author=self.admin, text='Удалённый')
+        Post.objects.filter(pk=post.pk).soft_delete()
+        url = reverse('admin:posts_post_changelist')
+
+        response = self.admin_client.get(url, {'is_deleted__exact': '1'})
+        self.assertEqual(
+            [obj.pk for obj in response.context['cl'].result_list],
+            [post.pk],
+        )
+
+        self.admin_client.post(url, {
+            'action': 'restore',
+            admin.ACTION_CHECKBOX_NAME: [post.pk],
+        })
+
+        restored = Post.objects.get(pk=post.pk)
+        self.assertIsNone(restored.deleted_at)
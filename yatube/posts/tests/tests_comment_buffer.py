@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..comment_buffer import CommentBuffer, comment_buffer
+from ..models import ArchivedComment, ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+TEMP_BUFFER_DIR = tempfile.mkdtemp()
+
+# Такого pid не бывает: он больше максимального pid в Linux
+DEAD_PID = 2 ** 22 + 1
+
+
+class OtherWorkerBuffer(CommentBuffer):
+    """Буфер второго воркера: свой журнал в том же каталоге."""
+    @property
+    def journal_path(self):
+        return os.path.join(TEMP_BUFFER_DIR, 'other-worker.jsonl')
+
+
+@override_settings(
+    COMMENT_BUFFER_ENABLED=True,
+    COMMENT_BUFFER_SIZE=10,
+    COMMENT_BUFFER_INTERVAL=60,
+    COMMENT_BUFFER_DIR=TEMP_BUFFER_DIR,
+)
+class CommentBufferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='commentator')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_BUFFER_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = Client()
+        self.auth_client.force_login(CommentBufferTests.user)
+
+    def tearDown(self):
+        comment_buffer.flush()
+
+    def test_buffered_comment_visible_to_author(self):
+        """Комментарий из буфера виден автору до записи в базу."""
+        self.auth_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Отложенный комментарий'},
+        )
+
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(os.path.exists(comment_buffer.journal_path))
+        response = self.auth_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(
+            response.context['comments'][0].text, 'Отложенный комментарий'
+        )
+
+        comment_buffer.flush()
+
+        self.assertEqual(Comment.objects.get().text, 'Отложенный комментарий')
+        self.assertFalse(os.path.exists(comment_buffer.journal_path))
+
+    def test_flush_comments_replays_orphan_journal(self):
+        """flush_comments дозаписывает журнал завершившегося процесса."""
+        path = os.path.join(TEMP_BUFFER_DIR, f'comments-{DEAD_PID}.jsonl')
+        with open(path, 'w', encoding='utf-8') as journal:
+            journal.write(json.dumps({
+                'post_id': self.post.pk,
+                'author_id': self.user.pk,
+                'text': 'Из журнала',
+                'slot': 1,
+            }) + '\n')
+            journal.write('{"post_id": ')
+
+        call_command('flush_comments')
+
+        self.assertEqual(Comment.objects.get().text, 'Из журнала')
+        self.assertFalse(os.path.exists(path))
+
+    def test_pending_comment_visible_from_other_worker(self):
+        """Неотправленный комментарий виден из буфера другого процесса."""
+        self.auth_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'С другого воркера'},
+        )
+
+        other_worker = CommentBuffer()
+
+        self.assertEqual(
+            other_worker.pending_for(self.post.pk, self.user.pk),
+            ['С другого воркера'],
+        )
+        comment_buffer.flush()
+        self.assertEqual(
+            other_worker.pending_for(self.post.pk, self.user.pk), []
+        )
+
+    def test_flush_keeps_pending_comments_of_other_worker(self):
+        """Запись буфера не прячет неотправленные комментарии соседа."""
+        other_worker = OtherWorkerBuffer()
+        self.addCleanup(other_worker.flush)
+        self.auth_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Первый'},
+        )
+        other_worker.add(
+            Comment(post=self.post, author=self.user, text='Второй')
+        )
+        self.assertEqual(
+            comment_buffer.pending_for(self.post.pk, self.user.pk),
+            ['Первый', 'Второй'],
+        )
+
+        comment_buffer.flush()
+
+        self.assertEqual(
+            comment_buffer.pending_for(self.post.pk, self.user.pk),
+            ['Второй'],
+        )
+
+    def test_comment_to_archived_post_kept(self):
+        """Комментарий к посту, ушедшему в архив, пишется в архив."""
+        post = Post.objects.create(author=self.user, text='Скоро в архив')
+        self.auth_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            {'text': 'Успел'},
+        )
+        ArchivedPost.objects.create(
+            pk=post.pk, author=self.user, text=post.text,
+            pub_date=post.pub_date,
+        )
+        Post.all_objects.filter(pk=post.pk).delete()
+
+        comment_buffer.flush()
+
+        self.assertEqual(
+            ArchivedComment.objects.get(post_id=post.pk).text, 'Успел'
+        )
+
+    def test_archived_comment_pk_not_taken_from_hot_comments(self):
+        """Комментарий к архивному посту не занимает pk горячей таблицы."""
+        hot_comment = Comment.objects.create(
+            post=self.post, author=self.user, text='Уйдёт в архив позже'
+        )
+        post = Post.objects.create(author=self.user, text='Скоро в архив')
+        self.auth_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            {'text': 'Успел'},
+        )
+        ArchivedPost.objects.create(
+            pk=post.pk, author=self.user, text=post.text,
+            pub_date=post.pub_date,
+        )
+        Post.all_objects.filter(pk=post.pk).delete()
+        comment_buffer.flush()
+
+        call_command('archive_posts', days=0, stdout=StringIO())
+
+        self.assertEqual(
+            ArchivedComment.objects.get(pk=hot_comment.pk).text,
+            'Уйдёт в архив позже',
+        )
+        self.assertGreater(
+            ArchivedComment.objects.get(post_id=post.pk).pk, hot_comment.pk
+        )
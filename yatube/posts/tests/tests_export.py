@@ -0,0 +1,97 @@
+import csv
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(author=cls.user, text='Новый пост')
+        cls.old_post = Post.objects.create(author=cls.user, text='Старый')
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=10)
+        )
+        Comment.objects.create(post=cls.post, author=cls.staff, text='Ок')
+        Follow.objects.create(user=cls.staff, author=cls.user)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(ExportTests.staff)
+
+    def test_export_requires_staff(self):
+        """Выгрузка недоступна обычному пользователю."""
+        client = Client()
+        client.force_login(self.user)
+
+        response = client.get(reverse('posts:export', args=['posts']))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_streams_ndjson(self):
+        """Персонал получает потоковую выгрузку NDJSON."""
+        response = self.staff_client.get(
+            reverse('posts:export', args=['comments'])
+        )
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+
+        self.assertEqual(rows[0]['text'], 'Ок')
+        self.assertEqual(rows[0]['author'], 'staff')
+
+    def test_export_gzip_with_date_filter(self):
+        """Фильтр по дате и сжатие gzip работают вместе."""
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response = self.staff_client.get(
+            reverse('posts:export', args=['posts']),
+            {'since': since, 'gzip': '1'},
+        )
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).splitlines()
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['id'], self.post.pk)
+
+    def test_export_command_writes_csv(self):
+        """Команда export_data пишет follows в формате import_follows."""
+        with tempfile.NamedTemporaryFile('r', suffix='.csv') as output:
+            call_command(
+                'export_data', 'follows', format='csv', output=output.name
+            )
+            rows = list(csv.DictReader(output))
+
+        self.assertEqual(rows, [{'follower': 'staff', 'author': 'user'}])
+
+    def test_export_skips_comments_of_deleted_posts(self):
+        """Комментарии к удалённому посту не попадают в выгрузку."""
+        Comment.objects.create(
+            post=self.old_post, author=self.staff, text='Скрыт'
+        )
+        Post.objects.filter(pk=self.old_post.pk).soft_delete()
+
+        response = self.staff_client.get(
+            reverse('posts:export', args=['comments'])
+        )
+        texts = [
+            json.loads(line)['text']
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+
+        self.assertEqual(texts, ['Ок'])
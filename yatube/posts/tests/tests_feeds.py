@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='feed_author')
+        cls.group = Group.objects.create(title='Группа', slug='feed-group')
+        Post.objects.create(
+            author=cls.user, group=cls.group, text='Пост для ленты'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_contain_posts(self):
+        """RSS и Atom ленты группы и автора содержат посты."""
+        urls = (
+            reverse('posts:group_rss', kwargs={'slug': 'feed-group'}),
+            reverse('posts:group_atom', kwargs={'slug': 'feed-group'}),
+            reverse('posts:profile_rss', kwargs={'username': 'feed_author'}),
+            reverse('posts:profile_atom', kwargs={'username': 'feed_author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertIn('Пост для ленты', response.content.decode())
+
+    def test_feed_conditional_get_and_invalidation(self):
+        """Без изменений лента отдаёт 304, новый пост меняет ETag."""
+        url = reverse('posts:group_rss', kwargs={'slug': 'feed-group'})
+        etag = self.guest_client.get(url)['ETag']
+
+        not_modified = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        changed = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(changed.status_code, HTTPStatus.OK)
+        self.assertIn('Новый пост', changed.content.decode())
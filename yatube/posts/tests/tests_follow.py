@@ -0,0 +1,63 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow
+
+User = get_user_model()
+
+
+class FollowBulkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='follower')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(FollowBulkTests.user)
+
+    def test_follow_bulk_creates_follows_once(self):
+        """Пакетная подписка не дублирует подписки и игнорирует себя."""
+        usernames = [author.username for author in self.authors]
+        data = {'username': usernames + ['follower', 'missing']}
+
+        self.auth_client.post(reverse('posts:follow_bulk'), data)
+        self.auth_client.post(reverse('posts:follow_bulk'), data)
+
+        self.assertEqual(self.user.follower.count(), len(self.authors))
+
+    def test_unfollow_bulk_removes_follows(self):
+        """Пакетная отписка удаляет выбранные подписки."""
+        for author in self.authors:
+            Follow.objects.create(user=self.user, author=author)
+
+        self.auth_client.post(reverse('posts:follow_bulk'), {
+            'username': [self.authors[0].username],
+            'action': 'unfollow',
+        })
+
+        self.assertEqual(self.user.follower.count(), len(self.authors) - 1)
+
+    def test_import_follows_command(self):
+        """Команда import_follows загружает граф подписок из CSV."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as source:
+            source.write('follower,author\n')
+            source.write('follower,author_0\n')
+            source.write('follower,author_0\n')
+            source.write('author_1,author_1\n')
+            source.write('author_2,follower\n')
+            source.flush()
+            call_command('import_follows', source.name, batch_size=2)
+
+        self.assertEqual(Follow.objects.count(), 2)
+        self.assertFalse(
+            Follow.objects.filter(user=self.authors[1]).exists()
+        )
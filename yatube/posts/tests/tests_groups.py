@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs.worker import Worker
+from ..models import Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupDirectoryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='member')
+        cls.group = Group.objects.create(title='Кошки', slug='cats')
+        cls.other = Group.objects.create(title='Собаки', slug='dogs')
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = Client()
+        self.auth_client.force_login(GroupDirectoryTests.user)
+
+    def test_stats_refreshed_by_queue(self):
+        """Статистика группы пересчитывается задачей после изменений."""
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Пост'
+        )
+        Post.objects.create(author=self.user, group=self.group, text='Ещё')
+        Worker().run(once=True)
+        self.assertEqual(self.group.stats.posts_count, 2)
+
+        post.group = self.other
+        post.save()
+        Worker().run(once=True)
+
+        counts = dict(
+            GroupStats.objects.values_list('group__slug', 'posts_count')
+        )
+        self.assertEqual(counts, {'cats': 1, 'dogs': 1})
+
+    def test_directory_lists_groups_with_stats(self):
+        """Каталог показывает группы с числом постов."""
+        Post.objects.create(author=self.user, group=self.group, text='Пост')
+        Worker().run(once=True)
+
+        response = self.auth_client.get(reverse('posts:groups'))
+
+        self.assertEqual(
+            [group.slug for group in response.context['page_obj']],
+            ['cats', 'dogs'],
+        )
+        self.assertEqual(
+            response.context['page_obj'][0].stats.posts_count, 1
+        )
+
+    def test_group_choices_cached_until_group_saved(self):
+        """Форма поста не читает группы из базы, пока они не менялись."""
+        url = reverse('posts:post_create')
+        self.auth_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.auth_client.get(url)
+        self.assertFalse(
+            any('posts_group' in query['sql'] for query in queries)
+        )
+
+        Group.objects.create(title='Птицы', slug='birds')
+        response = self.auth_client.get(url)
+        self.assertContains(response, 'Птицы')
@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+TEMP_DIR = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=os.path.join(TEMP_DIR, 'media'))
+class ImportDataTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='importer')
+        cls.group = Group.objects.create(title='Группа', slug='import')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def write(self, name, records):
+        path = os.path.join(TEMP_DIR, name)
+        with open(path, 'w', encoding='utf-8') as source:
+            for record in records:
+                source.write(json.dumps(record) + '\n')
+        return path
+
+    def test_import_posts_and_comments(self):
+        """Посты и комментарии импортируются с исходными датами."""
+        images_dir = os.path.join(TEMP_DIR, 'images')
+        os.makedirs(images_dir, exist_ok=True)
+        with open(os.path.join(images_dir, 'cat.gif'), 'wb') as image:
+            image.write(b'GIF89a')
+        posts = self.write('posts.ndjson', [
+            {'id': 100, 'text': 'Первый', 'author': 'importer',
+             'group': 'import', 'pub_date': '2020-01-01T10:00:00+00:00',
+             'image': 'cat.gif'},
+            {'text': 'Без автора', 'author': 'nobody'},
+        ])
+        comments = self.write('comments.ndjson', [
+            {'post': 100, 'author': 'importer', 'text': 'Комментарий'},
+            {'post': 999, 'author': 'importer', 'text': 'Потерянный'},
+        ])
+
+        call_command('import_data', 'posts', posts, images_dir=images_dir)
+        call_command('import_data', 'comments', comments)
+
+        post = Post.objects.get()
+        self.assertEqual(post.pk, 100)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(
+            post.pub_date, datetime(2020, 1, 1, 10, tzinfo=timezone.utc)
+        )
+        self.assertTrue(post.image.storage.exists(post.image.name))
+        self.assertEqual(Comment.objects.get().post, post)
+        self.assertFalse(os.path.exists(posts + '.checkpoint'))
+
+    def test_import_resumes_from_checkpoint(self):
+        """Импорт пропускает строки, уже записанные до сбоя."""
+        posts = self.write('resume.ndjson', [
+            {'text': 'Уже загружен', 'author': 'importer'},
+            {'text': 'Ещё нет', 'author': 'importer'},
+        ])
+        with open(posts + '.checkpoint', 'w') as checkpoint:
+            checkpoint.write('1')
+
+        call_command('import_data', 'posts', posts)
+
+        self.assertEqual(Post.objects.get().text, 'Ещё нет')
+
+    def test_repeated_import_skips_saved_posts(self):
+        """Повторный импорт не считает и не копирует уже записанное."""
+        images_dir = os.path.join(TEMP_DIR, 'repeat')
+        os.makedirs(images_dir, exist_ok=True)
+        with open(os.path.join(images_dir, 'dog.gif'), 'wb') as image:
+            image.write(b'GIF89a')
+        posts = self.write('repeat.ndjson', [
+            {'id': 200, 'text': 'Пост', 'author': 'importer',
+             'image': 'dog.gif'},
+            {'id': 'x', 'text': 'Битый id', 'author': 'importer'},
+        ])
+
+        call_command('import_data', 'posts', posts, images_dir=images_dir)
+        output, errors = StringIO(), StringIO()
+        call_command(
+            'import_data', 'posts', posts, images_dir=images_dir,
+            stdout=output, stderr=errors,
+        )
+
+        self.assertIn('Импортировано: 0', output.getvalue())
+        self.assertIn('Строка 2 пропущена: неверный id', errors.getvalue())
+        media = os.path.join(TEMP_DIR, 'media', 'posts')
+        copies = [
+            name for name in os.listdir(media) if name.startswith('dog')
+        ]
+        self.assertEqual(copies, ['dog.gif'])
+
+    def test_malformed_comment_reported(self):
+        """Строка с неверным post попадает в отчёт, а не роняет импорт."""
+        Post.objects.create(pk=300, author=self.user, text='Пост')
+        comments = self.write('bad_comments.ndjson', [
+            {'post': 'abc', 'author': 'importer', 'text': 'Битый'},
+            {'post': 300, 'author': 'importer', 'text': 'Целый'},
+        ])
+        errors = StringIO()
+
+        call_command(
+            'import_data', 'comments', comments,
+            stdout=StringIO(), stderr=errors,
+        )
+
+        self.assertEqual(Comment.objects.get().text, 'Целый')
+        self.assertIn('Строка 1 пропущена: неверный post', errors.getvalue())
+
+    def test_repeated_comment_import_skips_saved_rows(self):
+        """Повторный импорт комментариев не дублирует записанные строки."""
+        Post.objects.create(pk=400, author=self.user, text='Пост')
+        comments = self.write('repeat_comments.ndjson', [
+            {'id': 410, 'post': 400, 'author': 'importer', 'text': 'С id'},
+            {'post': 400, 'author': 'importer', 'text': 'Без id',
+             'pub_date': '2020-01-01T10:00:00+00:00'},
+        ])
+
+        call_command('import_data', 'comments', comments)
+        output = StringIO()
+        call_command('import_data', 'comments', comments, stdout=output)
+
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(Comment.objects.get(text='С id').pk, 410)
+        self.assertIn('Импортировано: 0', output.getvalue())
+
+    def test_comment_to_archived_post_imported_into_archive(self):
+        """Комментарий к архивному посту попадает в архив, а не теряется."""
+        ArchivedPost.objects.create(
+            pk=500, author=self.user, text='В архиве',
+            pub_date=datetime(2019, 1, 1, tzinfo=timezone.utc),
+        )
+        comments = self.write('archived_comments.ndjson', [
+            {'post': 500, 'author': 'importer', 'text': 'Старый',
+             'pub_date': '2019-01-02T00:00:00+00:00'},
+        ])
+
+        call_command('import_data', 'comments', comments)
+
+        comment = ArchivedComment.objects.get(post_id=500)
+        self.assertEqual(comment.text, 'Старый')
+        self.assertEqual(
+            comment.pub_date, datetime(2019, 1, 2, tzinfo=timezone.utc)
+        )
+        self.assertFalse(Comment.all_objects.exists())
+
+    def test_row_without_text_reported(self):
+        """Строка без text попадает в отчёт, а не роняет импорт."""
+        Post.objects.create(pk=600, author=self.user, text='Пост')
+        posts = self.write('no_text_posts.ndjson', [
+            {'author': 'importer'},
+            {'author': 'importer', 'text': 'Целый пост'},
+        ])
+        comments = self.write('no_text_comments.ndjson', [
+            {'post': 600, 'author': 'importer'},
+        ])
+        errors = StringIO()
+
+        call_command(
+            'import_data', 'posts', posts, stdout=StringIO(), stderr=errors,
+        )
+        call_command(
+            'import_data', 'comments', comments,
+            stdout=StringIO(), stderr=errors,
+        )
+
+        self.assertTrue(Post.objects.filter(text='Целый пост').exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            errors.getvalue().count('Строка 1 пропущена: нет текста'), 2
+        )
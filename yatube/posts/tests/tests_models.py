@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
+from jobs.models import Job
+
 from ..models import Group, Post
 
 User = get_user_model()
@@ -69,3 +71,18 @@ class PostsModelTests(TestCase):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_help_text
                 )
+
+    def test_thumbnails_queued_only_for_new_image(self):
+        """Превью ставятся в очередь, только когда меняется картинка."""
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image='posts/a.gif'
+        )
+        post.text = 'Другой текст'
+        post.save()
+        Post.objects.get(pk=post.pk).save()
+        post.image = 'posts/b.gif'
+        post.save()
+
+        self.assertEqual(
+            Job.objects.filter(name='posts.make_thumbnails').count(), 2
+        )
@@ -1,4 +1,7 @@
+import warnings
+
 from django.contrib.auth import get_user_model
+from django.core.cache import CacheKeyWarning
 from django.test import Client, TestCase
 
 from ..models import Group, Post
@@ -101,6 +104,14 @@ class PostsURLTests(TestCase):
         self.assertEqual(guest_response.reason_phrase, 'Not Found')
         self.assertEqual(auth_response.reason_phrase, 'Not Found')
 
+    def test_unusual_username_is_valid_cache_key(self):
+        """Имя из адреса с пробелами и любой длины не ломает ключ кэша."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.guest_client.get(f'/profile/{"no body" * 40}/')
+
+        self.assertEqual(response.status_code, 404)
+
     def test_urls_uses_correct_template(self):
         """Проверяем шаблоны приложения Posts."""
         group = PostsURLTests.group
@@ -1,11 +1,16 @@
+from datetime import timedelta
 from time import sleep
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django import forms
 
-from ..models import Group, Post
+from ..cache import VERSIONS_CACHE
+from ..models import ArchivedPost, Comment, Group, Post
 
 User = get_user_model()
 
@@ -253,3 +258,282 @@ class PostsViewsTests(TestCase):
         context_post = response.context['page_obj'][0]
 
         self.assertNotEqual(context_post, post)
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='commentator')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        cls.comments = [
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Комментарий {i}'
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(CommentsPaginationTests.user)
+
+    def test_post_detail_shows_first_comments_page(self):
+        """На странице поста выводится только первая страница комментариев."""
+        response = self.auth_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+
+        self.assertEqual(
+            response.context['comments'], self.comments[:-3:-1]
+        )
+        self.assertEqual(
+            response.context['next_cursor'], self.comments[3].pk
+        )
+
+    def test_post_comments_returns_next_pages(self):
+        """Фрагмент комментариев отдаёт страницы по курсору до конца."""
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+        response = self.auth_client.get(
+            url, {'cursor': self.comments[1].pk}
+        )
+
+        self.assertEqual(response.context['comments'], [self.comments[0]])
+        self.assertIsNone(response.context['next_cursor'])
+
+
+class PostDeleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.post = Post.objects.create(author=self.author, text='Пост')
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        self.author_client = Client()
+        self.author_client.force_login(PostDeleteTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(PostDeleteTests.reader)
+        self.delete_url = reverse(
+            'posts:delete', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_only_author_can_delete_post(self):
+        """Чужой пост удалить нельзя."""
+        self.reader_client.get(self.delete_url)
+
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_deleted_post_is_hidden(self):
+        """Удалённый пост скрыт, но остаётся в базе до очистки."""
+        self.author_client.get(self.delete_url)
+
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(Post.all_objects.filter(pk=self.post.pk).exists())
+        response = self.author_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_purge_deleted_removes_post_and_comments(self):
+        """purge_deleted окончательно удаляет пост и его комментарии."""
+        self.author_client.get(self.delete_url)
+
+        call_command('purge_deleted', batch_size=1)
+
+        self.assertFalse(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.all_objects.exists())
+
+
+class PostArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='archivist')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {i}')
+            for i in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='Старый комментарий'
+        )
+        Post.objects.filter(pk=cls.posts[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        call_command('archive_posts', days=7)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cache.clear()
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = Client()
+        self.auth_client.force_login(PostArchiveTests.user)
+
+    def test_old_post_moved_to_archive(self):
+        """Старый пост и его комментарии переносятся в архив."""
+        old_post = self.posts[0]
+
+        self.assertFalse(Post.all_objects.filter(pk=old_post.pk).exists())
+        archived = ArchivedPost.objects.get(pk=old_post.pk)
+        self.assertEqual(archived.comment.get().text, 'Старый комментарий')
+
+    def test_profile_feed_continues_into_archive(self):
+        """Лента профиля продолжается архивными постами."""
+        url = reverse('posts:profile', kwargs={'username': 'archivist'})
+        response = self.auth_client.get(url)
+
+        self.assertEqual(response.context['posts_count'], 3)
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [post.pk for post in reversed(self.posts)],
+        )
+        self.assertTrue(response.context['page_obj'][2].is_archived)
+
+    def test_post_detail_falls_through_to_archive(self):
+        """Страница архивного поста открывается по тому же адресу."""
+        response = self.auth_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.posts[0].pk})
+        )
+
+        self.assertTrue(response.context['post'].is_archived)
+        self.assertEqual(
+            response.context['comments'][0].text, 'Старый комментарий'
+        )
+
+    def test_author_deletes_archived_post(self):
+        """Автор удаляет архивный пост, и размер ленты пересчитывается."""
+        url = reverse('posts:profile', kwargs={'username': 'archivist'})
+        self.auth_client.get(url)
+
+        self.auth_client.get(
+            reverse('posts:delete', kwargs={'post_id': self.posts[0].pk})
+        )
+
+        self.assertFalse(ArchivedPost.objects.exists())
+        response = self.auth_client.get(url)
+        self.assertEqual(response.context['posts_count'], 2)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.reader = User.objects.create_user(username='reader')
+        Post.objects.create(author=cls.author, text='Общий пост')
+
+    def setUp(self):
+        cache.clear()
+        self.follower_client = Client()
+        self.follower_client.force_login(FragmentCacheTests.follower)
+        self.reader_client = Client()
+        self.reader_client.force_login(FragmentCacheTests.reader)
+        self.url = reverse('posts:profile', kwargs={'username': 'writer'})
+
+    def test_shared_posts_with_personal_follow_button(self):
+        """Список постов общий, а кнопка подписки своя у каждого."""
+        self.follower_client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'writer'})
+        )
+        follower_page = self.follower_client.get(self.url)
+        reader_page = self.reader_client.get(self.url)
+
+        self.assertContains(follower_page, 'Отписаться')
+        self.assertContains(reader_page, 'Подписаться')
+        self.assertContains(reader_page, 'Общий пост')
+        self.assertContains(reader_page, 'Пользователь: reader')
+
+    def test_cached_posts_skip_queries(self):
+        """Повторный просмотр берёт посты из кэша без чтения строк."""
+        self.follower_client.get(self.url)
+        with self.assertNumQueries(3):
+            # Пользователь сессии, число постов и подписка.
+            self.reader_client.get(self.url)
+
+    def test_new_post_replaces_cached_fragment(self):
+        """Новый пост автора сразу виден в закэшированном профиле."""
+        self.reader_client.get(self.url)
+        Post.objects.create(author=self.author, text='Свежий пост')
+
+        response = self.reader_client.get(self.url)
+
+        self.assertContains(response, 'Свежий пост')
+
+    def test_lost_version_does_not_revive_old_fragment(self):
+        """Вытесненный счётчик версии не возвращает старый фрагмент."""
+        self.reader_client.get(self.url)
+        Post.objects.create(author=self.author, text='Свежий пост')
+        caches[VERSIONS_CACHE].clear()
+
+        response = self.reader_client.get(self.url)
+
+        self.assertContains(response, 'Свежий пост')
+
+    def test_follow_feed_is_not_shared(self):
+        """Лента подписок одного пользователя не попадает к другому."""
+        self.follower_client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'writer'})
+        )
+        self.follower_client.get(reverse('posts:follow_index'))
+
+        response = self.reader_client.get(reverse('posts:follow_index'))
+
+        self.assertNotContains(response, 'Общий пост')
+
+
+class ResolverCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='resolved', first_name='Имя'
+        )
+        cls.group = Group.objects.create(title='Группа', slug='resolved')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_group_and_author_resolved_from_cache(self):
+        """Повторный запрос не ищет группу и автора в базе."""
+        for url in (
+            reverse('posts:group_posts', kwargs={'slug': 'resolved'}),
+            reverse('posts:profile', kwargs={'username': 'resolved'}),
+        ):
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                # Остаётся только подсчёт постов для пагинатора.
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_missing_slug_cached_until_created(self):
+        """404 кэшируется, но новая группа сразу доступна."""
+        url = reverse('posts:group_posts', kwargs={'slug': 'new'})
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+        Group.objects.create(title='Новая', slug='new')
+
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
+
+    def test_renamed_author_not_served_from_cache(self):
+        """После смены username старый адрес профиля даёт 404."""
+        url = reverse('posts:profile', kwargs={'username': 'resolved'})
+        self.guest_client.get(url)
+
+        self.author.username = 'renamed'
+        self.author.save()
+
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+        self.author.username = 'resolved'
+        self.author.save()
@@ -1,21 +1,34 @@
 # posts/urls.py
 from django.urls import path
-from . import views
+from . import feeds, views
 
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('group/', views.groups, name='groups'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('group/<slug:slug>/rss/', feeds.cached_feed(feeds.GroupFeed),
+         name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.cached_feed(feeds.AtomGroupFeed),
+         name='group_atom'),
     path('create/', views.post_create, name='post_create'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/rss/',
+         feeds.cached_feed(feeds.AuthorFeed), name='profile_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.cached_feed(feeds.AtomAuthorFeed), name='profile_atom'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/delete/', views.delete_post, name='delete'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
+    path('export/<str:kind>/', views.export_data, name='export'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/bulk/', views.follow_bulk, name='follow_bulk'),
     path('profile/<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('profile/<str:username>/unfollow/', views.profile_unfollow,
@@ -0,0 +1,318 @@
+import hashlib
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.functional import SimpleLazyObject, cached_property
+
+from jobs.registry import enqueue
+from .cache import bump_version, get_version
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Group, GroupStats, Post
+)
+
+User = get_user_model()
+
+# SQLite ограничивает число параметров в одном запросе
+LOOKUP_BATCH_SIZE = 500
+
+
+def chunked(iterable, size):
+    """Разбивает поток значений на списки длиной не больше size."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def resolve_ids(queryset, field, values, known):
+    """Дополняет словарь «значение поля -> pk» недостающими значениями.
+
+    Словарь known живёт всё время импорта, поэтому каждое значение
+    ищется в базе только один раз.
+    """
+    missing = set(values) - set(known) - {None, ''}
+    for part in chunked(missing, LOOKUP_BATCH_SIZE):
+        known.update(
+            queryset.filter(**{f'{field}__in': part}).values_list(field, 'pk')
+        )
+    return known
+
+
+def bulk_follow(edges, batch_size=None):
+    """Создаёт подписки пачками из пар (user_id, author_id).
+
+    Подписки на самого себя отбрасываются, повторные подписки
+    пропускаются базой благодаря ограничению unique_following.
+    Возвращает число пар, отправленных в базу.
+    """
+    batch_size = batch_size or settings.FOLLOW_BATCH_SIZE
+    sent = 0
+    for chunk in chunked(edges, batch_size):
+        follows = [
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in set(chunk)
+            if user_id != author_id
+        ]
+        Follow.objects.bulk_create(
+            follows,
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        for user_id in {follow.user_id for follow in follows}:
+            bump_version(f'follow:{user_id}')
+        sent += len(follows)
+    return sent
+
+
+def bulk_unfollow(user_id, author_ids, batch_size=None):
+    """Удаляет подписки пользователя на авторов пачками."""
+    batch_size = batch_size or settings.FOLLOW_BATCH_SIZE
+    deleted = 0
+    for chunk in chunked(author_ids, batch_size):
+        count, _ = Follow.objects.filter(
+            user_id=user_id, author_id__in=chunk
+        ).delete()
+        deleted += count
+    bump_version(f'follow:{user_id}')
+    return deleted
+
+
+def parse_cursor(value):
+    """Превращает курсор из GET-параметра в число или None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_comments_page(post, cursor=None, limit=None):
+    """Возвращает страницу комментариев поста и курсор следующей.
+
+    Страница строится по ключу pk: комментарии старше курсора, от новых
+    к старым. Курсор следующей страницы равен None, если она пуста.
+    """
+    limit = limit or settings.COMMENTS_PER_PAGE
+    comments = post.comment.select_related('author')
+    if cursor is not None:
+        comments = comments.filter(pk__lt=cursor)
+    comments = list(comments.order_by('-pk')[:limit + 1])
+    if len(comments) > limit:
+        comments = comments[:limit]
+        return comments, comments[-1].pk
+    return comments, None
+
+
+def get_post_or_404(post_id):
+    """Ищет пост в горячей таблице, а затем в архиве."""
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is not None:
+        return post
+    return get_object_or_404(
+        ArchivedPost.objects.select_related('author', 'group'), pk=post_id
+    )
+
+
+GROUP_KEY = 'posts:group:{}'
+AUTHOR_KEY = 'posts:author:{}'
+# Поля автора, которые нужны страницам профиля и лентам.
+AUTHOR_FIELDS = ('id', 'username', 'first_name', 'last_name')
+
+
+def archive_comments(comments):
+    """Переносит комментарии в архив с теми же pk.
+
+    Номера архивных комментариев берутся только из горячей таблицы,
+    поэтому перенос следующих постов не столкнётся с уже занятым pk.
+    """
+    comments = list(comments)
+    ArchivedComment.objects.bulk_create([
+        ArchivedComment(
+            pk=comment.pk,
+            post_id=comment.post_id,
+            author_id=comment.author_id,
+            text=comment.text,
+            pub_date=comment.pub_date,
+        )
+        for comment in comments
+    ])
+    Comment.all_objects.filter(
+        pk__in=[comment.pk for comment in comments]
+    ).delete()
+
+
+def lookup_key(template, value):
+    """Ключ кэша со значением из адреса в виде хэша.
+
+    Memcached не принимает ключи с пробелами, управляющими символами
+    и длиннее 250 символов, а slug и username приходят от клиента.
+    """
+    return template.format(hashlib.md5(str(value).encode()).hexdigest())
+
+
+def cached_lookup(key, load):
+    """Кэширует результат load(), в том числе отсутствие объекта.
+
+    Найденное живёт RESOLVER_CACHE_TIMEOUT секунд, отсутствие — только
+    RESOLVER_NEGATIVE_TIMEOUT, чтобы новый объект быстро стал доступен
+    даже без сигнала. Сигналы сбрасывают ключ при сохранении.
+    """
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        cache.set(
+            key,
+            value if value is not None else False,
+            settings.RESOLVER_CACHE_TIMEOUT if value is not None
+            else settings.RESOLVER_NEGATIVE_TIMEOUT,
+        )
+    return value or None
+
+
+def resolve_group(slug):
+    """Группа по slug из кэша или None."""
+    return cached_lookup(
+        lookup_key(GROUP_KEY, slug), Group.objects.filter(slug=slug).first
+    )
+
+
+def resolve_author(username):
+    """Пользователь по username из кэша или None.
+
+    Загружены только AUTHOR_FIELDS, остальные поля дочитываются из базы
+    при первом обращении.
+    """
+    data = cached_lookup(
+        lookup_key(AUTHOR_KEY, username),
+        User.objects.filter(username=username).values(*AUTHOR_FIELDS).first,
+    )
+    if data is None:
+        return None
+    return User.from_db(
+        None, list(AUTHOR_FIELDS), [data[name] for name in AUTHOR_FIELDS]
+    )
+
+
+def get_group_or_404(slug):
+    group = resolve_group(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def get_author_or_404(username):
+    author = resolve_author(username)
+    if author is None:
+        raise Http404('Пользователь не найден')
+    return author
+
+
+def refresh_group_stats(group_ids):
+    """Пересчитывает GroupStats для перечисленных групп."""
+    for chunk in chunked(set(group_ids) - {None}, LOOKUP_BATCH_SIZE):
+        stats = {
+            pk: {'posts_count': 0, 'last_post_at': None}
+            for pk in Group.objects.filter(
+                pk__in=chunk
+            ).values_list('pk', flat=True)
+        }
+        for model in (Post, ArchivedPost):
+            rows = model.objects.filter(group_id__in=stats).values(
+                'group_id'
+            ).annotate(count=Count('pk'), last=Max('pub_date')).order_by()
+            for row in rows:
+                group_stats = stats[row['group_id']]
+                group_stats['posts_count'] += row['count']
+                if (group_stats['last_post_at'] is None
+                        or row['last'] > group_stats['last_post_at']):
+                    group_stats['last_post_at'] = row['last']
+        for pk, defaults in stats.items():
+            GroupStats.objects.update_or_create(group_id=pk, defaults=defaults)
+
+
+def schedule_group_stats(*group_ids):
+    """Ставит пересчёт статистики групп в очередь задач."""
+    for group_id in set(group_ids) - {None}:
+        enqueue('posts.refresh_group_stats', {'group_id': group_id})
+
+
+def group_choices():
+    """Пары (pk, название) всех групп до следующего изменения групп."""
+    key = 'posts:group_choices:{}'.format(get_version('groups'))
+    choices = cache.get(key)
+    if choices is None:
+        choices = list(Group.objects.values_list('pk', 'title'))
+        cache.set(key, choices, None)
+    return choices
+
+
+def is_following(user, author):
+    """Подписан ли user на author; ответ живёт до смены его подписок."""
+    key = 'posts:following:{}:{}:{}'.format(
+        user.pk, author.pk, get_version(f'follow:{user.pk}')
+    )
+    return cache.get_or_set(
+        key, lambda: user.follower.filter(author=author).exists(), None
+    )
+
+
+class PartitionedFeed:
+    """Лента из горячих постов, продолженная архивными.
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator.
+    Архив читается, только если страница выходит за горячие посты,
+    а его размер берётся из кэша до следующего запуска archive_posts.
+    Для выборок, которые меняются и без архивации (например, ленты
+    подписок), кэш размера отключается параметром cache_count.
+    """
+    def __init__(self, hot, archive, cache_count=True):
+        self.hot = hot.select_related('author', 'group')
+        self.archive = archive.select_related('author', 'group')
+        self.cache_count = cache_count
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    @cached_property
+    def archive_count(self):
+        if not self.cache_count:
+            return self.archive.count()
+        query = str(self.archive.query).encode()
+        key = 'posts:archive_count:{}:{}'.format(
+            get_version('archive'), hashlib.md5(query).hexdigest()
+        )
+        return cache.get_or_set(key, self.archive.count, None)
+
+    def count(self):
+        return self.hot_count + self.archive_count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        # Строки страницы читаются только при выводе, поэтому шаблон,
+        # взявший список из кэша фрагментов, обходится без запроса.
+        return SimpleLazyObject(
+            partial(self.get_slice, key.start or 0, key.stop)
+        )
+
+    def get_slice(self, start, stop):
+        posts = []
+        if start < self.hot_count:
+            posts = list(self.hot[start:stop])
+        if stop is None or stop > self.hot_count:
+            posts += list(self.archive[
+                max(start - self.hot_count, 0):
+                None if stop is None else stop - self.hot_count
+            ])
+        return posts
@@ -1,20 +1,36 @@
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Post, Group, Follow
+from .models import ArchivedPost, Comment, Post, Group, Follow
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import require_POST
 
+from jobs.registry import enqueue
 from yatube.settings import LIMIT_POSTS, CACHE_TIMEOUT
+from .cache import fragment_context, invalidate_post
+from .comment_buffer import comment_buffer
+from .export import EXPORTS, FORMATS, export_stream, parse_moment
 from .forms import PostForm, CommentForm
+from .utils import (
+    PartitionedFeed, bulk_follow, bulk_unfollow, get_author_or_404,
+    get_comments_page, get_group_or_404, get_post_or_404, is_following,
+    parse_cursor, schedule_group_stats
+)
 
 
 # Главная страница
 @cache_page(CACHE_TIMEOUT, key_prefix='index_page')
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.all()
+    posts = PartitionedFeed(Post.objects.all(), ArchivedPost.objects.all())
     paginator = Paginator(posts, LIMIT_POSTS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -28,8 +44,10 @@ def index(request):
 # Страница с постами группы
 def group_posts(request, slug):
     template = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
+    group = get_group_or_404(slug)
+    posts = PartitionedFeed(
+        group.posts.all(), group.archived_posts.all()
+    )
     paginator = Paginator(posts, LIMIT_POSTS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -38,27 +56,41 @@ def group_posts(request, slug):
         'page_obj': page_obj,
         'posts': posts,
         'paginator': paginator,
+        **fragment_context(f'group:{group.pk}', 'archive'),
     }
     return render(request, template, context)
 
 
+# Каталог групп с числом постов и последней активностью
+def groups(request):
+    groups = Group.objects.select_related('stats')
+    paginator = Paginator(groups, settings.GROUPS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/groups.html', context)
+
+
 # Все посты в профиле пользователя
 def profile(request, username):
 
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    author = get_author_or_404(username)
+    posts = PartitionedFeed(
+        author.posts.all(), author.archived_posts.all()
+    )
     paginator = Paginator(posts, LIMIT_POSTS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
         'author': author,
-        "posts_count": author.posts.count()
+        "posts_count": posts.count(),
+        **fragment_context(f'author:{author.pk}', 'archive'),
     }
 
     if request.user.is_authenticated:
-        following_exist = request.user.follower.filter(author=author).exists()
-        context["following"] = following_exist
+        context["following"] = is_following(request.user, author)
 
     return render(request, 'posts/profile.html', context)
 
@@ -66,21 +98,52 @@ def profile(request, username):
 # Раскрыть пост полностью
 def post_detail(request, post_id):
 
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comment.all()
+    post = get_post_or_404(post_id)
+    comments, next_cursor = get_comments_page(post)
     comment_form = CommentForm(request.POST or None)
+    pending = []
+
+    if settings.COMMENT_BUFFER_ENABLED and request.user.is_authenticated:
+        pending = comment_buffer.pending_for(post.pk, request.user.pk)
+        comments = [
+            Comment(post=post, author=request.user, text=text)
+            for text in reversed(pending)
+        ] + comments
 
     context = {
         "post": post,
         "author": post.author,
-        "posts_count": post.author.posts.count(),
+        # Считается, только если боковая колонка не взята из кэша.
+        "posts_count": SimpleLazyObject(PartitionedFeed(
+            post.author.posts.all(), post.author.archived_posts.all()
+        ).count),
         'comment_form': comment_form,
         'comments': comments,
+        'next_cursor': next_cursor,
+        # Свои неотправленные комментарии видит только автор,
+        # поэтому такой список кэшируется отдельно для него.
+        'comments_owner': request.user.pk if pending else '',
+        **fragment_context(
+            f'post:{post.pk}', f'author:{post.author_id}', 'archive'
+        ),
     }
 
     return render(request, 'posts/post_detail.html', context)
 
 
+# Следующая страница комментариев к посту
+def post_comments(request, post_id):
+    post = get_post_or_404(post_id)
+    cursor = parse_cursor(request.GET.get('cursor'))
+    comments, next_cursor = get_comments_page(post, cursor)
+    context = {
+        'post': post,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/comments.html', context)
+
+
 # создать новый пост
 @login_required
 def post_create(request):
@@ -128,8 +191,24 @@ def post_edit(request, post_id):
 # Удалить пост
 @login_required
 def delete_post(request, post_id):
-    remove_post = Post.objects.filter(pk=post_id)
-    remove_post.delete()
+    post = get_post_or_404(post_id)
+    if post.author != request.user:
+        return redirect('posts:post_detail', post_id=post_id)
+
+    # Удаление и задачи после него фиксируются вместе.
+    with transaction.atomic():
+        if post.is_archived:
+            # В архиве нет пометки удаления: пост удаляется сразу вместе
+            # с комментариями, а картинку уберёт очередь задач.
+            post.delete()
+            if post.image:
+                enqueue('posts.delete_images', {'image': post.image.name})
+        else:
+            # Комментарии и файлы удалит команда purge_deleted.
+            Post.objects.filter(pk=post.pk).soft_delete()
+        schedule_group_stats(post.group_id)
+    if not post.is_archived:
+        invalidate_post(post)
 
     return redirect('posts:index')
 
@@ -144,7 +223,10 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        if settings.COMMENT_BUFFER_ENABLED:
+            comment_buffer.add(comment)
+        else:
+            comment.save()
 
     return redirect('posts:post_detail', post_id=post_id)
 
@@ -152,14 +234,18 @@ def add_comment(request, post_id):
 # Вывод постов, на которых подписан текущий пользователь
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__following__user=request.user)
+    posts = PartitionedFeed(
+        Post.objects.filter(author__following__user=request.user),
+        ArchivedPost.objects.filter(author__following__user=request.user),
+        cache_count=False,
+    )
     paginator = Paginator(posts, settings.LIMIT_POSTS)
     page_number = request.GET.get('page_obj')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
         'paginator': paginator,
+        **fragment_context(f'follow:{request.user.pk}', 'posts', 'archive'),
     }
     return render(request, 'posts/follow.html', context)
 
@@ -167,7 +253,7 @@ def follow_index(request):
 # Добавить подписку на автора
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_author_or_404(username)
     if author != request.user:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', username=username)
@@ -179,7 +265,48 @@ def profile_unfollow(request, username):
     user_follower = get_object_or_404(
         Follow,
         user=request.user,
-        author__username=username
+        author=get_author_or_404(username)
     )
     user_follower.delete()
     return redirect('posts:profile', username)
+
+
+# Подписаться или отписаться сразу от нескольких авторов
+@login_required
+@require_POST
+def follow_bulk(request):
+    usernames = request.POST.getlist('username')
+    author_ids = User.objects.filter(
+        username__in=usernames
+    ).exclude(pk=request.user.pk).values_list('pk', flat=True)
+
+    if request.POST.get('action') == 'unfollow':
+        deleted = bulk_unfollow(request.user.pk, author_ids)
+        return JsonResponse({'unfollowed': deleted})
+
+    sent = bulk_follow((request.user.pk, pk) for pk in author_ids)
+    return JsonResponse({'followed': sent})
+
+
+# Потоковая выгрузка данных для персонала
+@staff_member_required
+def export_data(request, kind):
+    fmt = request.GET.get('format', 'ndjson')
+    if kind not in EXPORTS or fmt not in FORMATS:
+        return HttpResponseBadRequest('Неизвестный набор или формат')
+    try:
+        since = parse_moment(request.GET.get('since'))
+        until = parse_moment(request.GET.get('until'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+
+    gzip = request.GET.get('gzip') == '1'
+    filename = f'{kind}.{fmt}' + ('.gz' if gzip else '')
+    response = StreamingHttpResponse(
+        export_stream(kind, fmt, since, until, gzip),
+        content_type='application/gzip' if gzip else (
+            'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        ),
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
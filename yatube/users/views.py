@@ -7,6 +7,8 @@ from django.views.generic import CreateView
 from django.urls import reverse_lazy
 
 
+from jobs.registry import enqueue
+
 # Импортируем класс формы, чтобы сослаться на неё во view-классе
 from .forms import CreationForm
 
@@ -16,3 +18,9 @@ class SignUp(CreateView):
     # После успешной регистрации перенаправляем пользователя на главную.
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # Письмо отправит воркер очереди, регистрация его не ждёт.
+        enqueue('users.send_welcome_email', {'user_id': self.object.pk})
+        return response
@@ -0,0 +1,376 @@
+"""Боевой WSGI-сервер на стандартной библиотеке: prefork + потоки.
+
+Запуск из каталога с manage.py:
+
+    DJANGO_ENV=prod SECRET_KEY=... python -m yatube.server \\
+        --bind 0.0.0.0:8000 --workers 4 --threads 8
+
+Мастер открывает сокет и форкает воркеры, сам Django не импортирует.
+Каждый воркер после форка импортирует yatube.wsgi, прогревает
+приложение запросами к --warmup и только потом сообщает мастеру о
+готовности и начинает принимать соединения. Воркер обслуживает до
+--threads запросов параллельно и после --max-requests (плюс случайная
+добавка до --max-requests-jitter) перестаёт принимать соединения,
+дожидается текущих запросов и выходит; мастер запускает замену.
+
+Сигналы мастеру:
+    HUP — плавный перезапуск: новое поколение воркеров с новым кодом
+    поднимается и прогревается, затем старое дорабатывает текущие
+    запросы и выходит. Сокет всё время открыт, ожидающие соединения
+    копятся в его очереди, поэтому ни одно не теряется;
+    TERM, INT — плавная остановка, через --graceful-timeout секунд
+    оставшиеся воркеры завершаются принудительно.
+"""
+import argparse
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+from wsgiref.util import setup_testing_defaults
+
+logger = logging.getLogger('yatube.server')
+
+# Если воркер упал, не успев прогреться, новый запускается не сразу.
+RESPAWN_DELAY = 1
+
+
+class RequestHandler(WSGIRequestHandler):
+    access_log = False
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            super().log_message(format, *args)
+
+
+class Worker:
+    """Процесс-воркер: прогрев, пул потоков, выход после max_requests."""
+    def __init__(self, listener, options):
+        self.listener = listener
+        self.options = options
+        self.max_requests = options.max_requests
+        if self.max_requests and options.max_requests_jitter:
+            self.max_requests += random.randint(
+                0, options.max_requests_jitter
+            )
+        self.alive = True
+        self.handled = 0
+        self.lock = threading.Lock()
+
+    def run(self, ready_fd):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        server = self.load()
+        self.warm_up(server.get_app())
+        os.write(ready_fd, b'1')
+        os.close(ready_fd)
+        self.serve(server)
+        self.shutdown()
+
+    def stop(self, signum, frame):
+        self.alive = False
+
+    def load(self):
+        from yatube.wsgi import application
+
+        host, port = self.listener.getsockname()[:2]
+        server = WSGIServer(
+            (host, port), RequestHandler, bind_and_activate=False
+        )
+        server.socket.close()
+        server.socket = self.listener
+        server.server_name, server.server_port = host, port
+        server.setup_environ()
+        server.set_app(application)
+        RequestHandler.access_log = self.options.access_log
+        return server
+
+    def warm_up(self, application):
+        """Первые запросы: шаблоны, маршруты и кэши готовы до трафика."""
+        from django.conf import settings
+
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+        host = hosts[0].lstrip('.') if hosts else 'localhost'
+        for path in self.options.warmup:
+            environ = {'PATH_INFO': path, 'HTTP_HOST': host}
+            setup_testing_defaults(environ)
+            statuses = []
+            body = application(
+                environ, lambda status, headers, *args: statuses.append(
+                    status
+                )
+            )
+            try:
+                for _ in body:
+                    pass
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            logger.debug('Прогрев %s: %s', path, statuses[0])
+
+    def serve(self, server):
+        threads = self.options.threads
+        # Соединение принимается, только когда есть свободный поток:
+        # остальные ждут в очереди сокета и достаются другим воркерам.
+        slots = threading.BoundedSemaphore(threads)
+        with ThreadPoolExecutor(threads) as pool:
+            while self.alive:
+                if not slots.acquire(timeout=0.5):
+                    continue
+                try:
+                    readable, _, _ = select.select(
+                        [self.listener], [], [], 0.5
+                    )
+                    connection, address = self.listener.accept()
+                except (BlockingIOError, InterruptedError, ValueError):
+                    # Соединение забрал другой воркер или сокета нет.
+                    slots.release()
+                    continue
+                connection.setblocking(True)
+                pool.submit(self.handle, server, connection, address, slots)
+        # Выход из with дожидается запросов, уже взятых в работу.
+
+    def shutdown(self):
+        """Дописывает то, что воркер держит в памяти, перед выходом.
+
+        Воркер завершается через os._exit, а он пропускает atexit:
+        без этого отложенные комментарии и трассы терялись бы.
+        """
+        from core import tracing
+        from posts.comment_buffer import comment_buffer
+
+        for hook in (comment_buffer.flush, tracing.flush):
+            try:
+                hook()
+            except Exception:
+                logger.exception('Ошибка при остановке воркера')
+
+    def handle(self, server, connection, address, slots):
+        try:
+            server.finish_request(connection, address)
+        except Exception:
+            server.handle_error(connection, address)
+        finally:
+            server.shutdown_request(connection)
+            slots.release()
+            with self.lock:
+                self.handled += 1
+                if self.max_requests and self.handled >= self.max_requests:
+                    self.alive = False
+
+
+class Arbiter:
+    """Мастер-процесс: держит нужное число готовых воркеров."""
+    def __init__(self, options):
+        self.options = options
+        self.listener = None
+        self.workers = {}
+        self.generation = 0
+        self.signals = []
+        self.stopping = False
+        self.respawn_at = 0
+
+    def run(self):
+        self.listener = self.bind()
+        self.wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_write, False)
+        signal.set_wakeup_fd(wakeup_write)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.on_signal)
+        # Обработчик нужен только чтобы будить select через wakeup_fd:
+        # вышедший воркер заменяется сразу, а не по таймауту.
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        logger.info(
+            'Слушаю %s:%s, воркеров %s по %s потоков',
+            *self.listener.getsockname()[:2],
+            self.options.workers, self.options.threads,
+        )
+        while not self.stopping:
+            self.manage_workers()
+            self.wait()
+            self.reap()
+            self.handle_signals()
+        self.shutdown()
+
+    def bind(self):
+        host, port = self.options.bind.rsplit(':', 1)
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, int(port)))
+        listener.listen(self.options.backlog)
+        listener.setblocking(False)
+        return listener
+
+    def on_signal(self, signum, frame):
+        self.signals.append(signum)
+
+    def manage_workers(self):
+        current = [
+            worker for worker in self.workers.values()
+            if worker['generation'] == self.generation
+        ]
+        missing = self.options.workers - len(current)
+        if missing > 0 and time.monotonic() >= self.respawn_at:
+            for _ in range(missing):
+                self.spawn()
+        ready = [worker for worker in current if worker['ready']]
+        if len(ready) < self.options.workers:
+            return
+        # Новое поколение готово: старое дорабатывает и выходит.
+        for pid, worker in self.workers.items():
+            if worker['generation'] < self.generation:
+                if not worker['retiring']:
+                    self.kill(pid, signal.SIGTERM)
+                    worker['retiring'] = True
+
+    def spawn(self):
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            os.close(ready_read)
+            os.close(self.wakeup_read)
+            for worker in self.workers.values():
+                if worker['ready_fd'] is not None:
+                    os.close(worker['ready_fd'])
+            status = 0
+            try:
+                Worker(self.listener, self.options).run(ready_write)
+            except Exception:
+                logger.exception('Воркер %s упал', os.getpid())
+                status = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        os.close(ready_write)
+        self.workers[pid] = {
+            'generation': self.generation,
+            'ready': False,
+            'ready_fd': ready_read,
+            'retiring': False,
+        }
+        logger.debug('Запущен воркер %s', pid)
+
+    def wait(self):
+        pending = {
+            worker['ready_fd']: pid
+            for pid, worker in self.workers.items()
+            if worker['ready_fd'] is not None
+        }
+        try:
+            readable, _, _ = select.select(
+                [self.wakeup_read, *pending], [], [], 1
+            )
+        except InterruptedError:
+            return
+        for fd in readable:
+            if fd == self.wakeup_read:
+                os.read(fd, 512)
+                continue
+            worker = self.workers[pending[fd]]
+            # Пустое чтение — воркер вышел, не успев прогреться.
+            worker['ready'] = bool(os.read(fd, 1))
+            os.close(fd)
+            worker['ready_fd'] = None
+            if worker['ready']:
+                logger.debug('Воркер %s готов', pending[fd])
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if worker['ready_fd'] is not None:
+                os.close(worker['ready_fd'])
+            if not worker['ready'] and not self.stopping:
+                logger.error('Воркер %s не запустился', pid)
+                self.respawn_at = time.monotonic() + RESPAWN_DELAY
+            elif not worker['retiring']:
+                logger.debug('Воркер %s отработал и вышел', pid)
+
+    def handle_signals(self):
+        while self.signals:
+            signum = self.signals.pop(0)
+            if signum == signal.SIGHUP:
+                logger.info('Плавный перезапуск воркеров')
+                self.generation += 1
+            else:
+                self.stopping = True
+
+    def kill(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def shutdown(self):
+        logger.info('Остановка, жду текущие запросы')
+        for pid in self.workers:
+            self.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.options.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self.reap()
+        for pid in self.workers:
+            self.kill(pid, signal.SIGKILL)
+        self.listener.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Prefork WSGI-сервер для yatube.'
+    )
+    parser.add_argument('--bind', default='127.0.0.1:8000')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Число процессов, по умолчанию по числу ядер',
+    )
+    parser.add_argument(
+        '--threads', type=int, default=4,
+        help='Потоков на воркер: сколько запросов он ведёт параллельно',
+    )
+    parser.add_argument(
+        '--max-requests', type=int, default=1000,
+        help='Воркер перезапускается после стольких запросов, 0 — никогда',
+    )
+    parser.add_argument('--max-requests-jitter', type=int, default=100)
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--graceful-timeout', type=float, default=30)
+    parser.add_argument(
+        '--warmup', action='append',
+        help='Адрес для прогрева воркера, можно несколько; по умолчанию /',
+    )
+    parser.add_argument('--access-log', action='store_true')
+    parser.add_argument('--log-level', default='INFO')
+    options = parser.parse_args(argv)
+    options.warmup = options.warmup or ['/']
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    logging.basicConfig(
+        level=options.log_level,
+        format='[%(asctime)s] %(process)d %(levelname)s %(message)s',
+    )
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    Arbiter(options).run()
+
+
+if __name__ == '__main__':
+    main()
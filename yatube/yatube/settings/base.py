@@ -0,0 +1,334 @@
+"""
+Django settings for yatube project.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+Общие настройки. Окружения dev и prod дополняют их в dev.py и prod.py,
+нужное выбирает yatube/settings/__init__.py по DJANGO_ENV.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+import tempfile
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'tssm36d)wgwm*uoq^g*-2v6=3id+hdrasb-qwf_%3c5$s)e4^r'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'posts.apps.PostsConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'users.apps.UsersConfig',
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ProfilerMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Должен оставаться последним, см. core.middleware.TracingMiddleware
+    'core.middleware.TracingMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+
+TEMPLATES = [
+    {
+        'BACKEND': 'core.template.InstrumentedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            # auth и messages уже ленивые: пользователь и сообщения
+            # читаются, только когда шаблон к ним обращается. Свои
+            # процессоры оборачиваются в core.timing.lazy_processor.
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+            'builtins': ['core.templatetags.tracing'],
+        },
+    },
+]
+
+# Время контекст-процессоров в заголовке Server-Timing (core.middleware)
+SERVER_TIMING = False
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Готовые страницы из команды prerender (core.prerender)
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+
+
+# User authentication and authorisation
+
+AUTHENTICATION_BACKENDS = ['core.backends.CachedModelBackend']
+
+USER_CACHE_TIMEOUT = 60 * 15
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+LOGIN_URL = 'users:login'
+
+LOGIN_REDIRECT_URL = 'posts:index'
+
+
+# Connecting the engine filebased.EmailBackend
+# Письма уходят через очередь задач (jobs.mail), а отправляет их воркер
+# бэкендом QUEUED_EMAIL_BACKEND.
+
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+
+# Caches
+
+# Горячие ключи отдаются из памяти воркера, остальное — из общего кэша.
+# При разработке и в тестах общий уровень — память процесса; боевые
+# настройки подставляют общий сервер (prod.py).
+# Версии наборов ключей (posts.cache) лежат отдельно: там нужен
+# атомарный incr и нельзя вытеснять счётчики ради данных.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+            'SYNC_INTERVAL': 1,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube-shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube-versions',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000000,
+        },
+    },
+}
+
+
+# Custom Errors
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+
+# Custom Constants and No Magic Numbers
+
+LIMIT_POSTS = 10
+
+POST_SYMBOLS = 15
+
+COMMENT_SYMBOLS = 60
+
+CACHE_TIMEOUT = 20
+
+FOLLOW_BATCH_SIZE = 1000
+
+COMMENTS_PER_PAGE = 20
+
+GROUPS_PER_PAGE = 50
+
+PURGE_BATCH_SIZE = 500
+
+ARCHIVE_AFTER_DAYS = 365
+
+API_MAX_LIMIT = 100
+
+FEED_ITEMS = 20
+
+EXPORT_CHUNK_SIZE = 2000
+
+IMPORT_BATCH_SIZE = 500
+
+ADMIN_TEXT_PREVIEW = 80
+
+ADMIN_COUNT_CACHE_TIMEOUT = 60
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+RESOLVER_CACHE_TIMEOUT = 60 * 60
+
+RESOLVER_NEGATIVE_TIMEOUT = 60
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+API_CACHE_TIMEOUT = 60
+
+ARCHIVE_BATCH_SIZE = 500
+
+# Очередь задач (jobs)
+
+JOBS_POLL_INTERVAL = 1
+
+JOBS_RETRY_DELAY = 30
+
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+EMAIL_BATCH_SIZE = 50
+
+# Отложенная запись комментариев (posts.comment_buffer)
+
+COMMENT_BUFFER_ENABLED = False
+
+COMMENT_BUFFER_SIZE = 50
+
+COMMENT_BUFFER_INTERVAL = 2
+
+COMMENT_BUFFER_DIR = os.path.join(BASE_DIR, 'comment_buffer')
+
+# Сэмплирующий профилировщик (core.profiling)
+
+PROFILER_MODULES = ('posts', 'users', 'core')
+
+PROFILER_INTERVAL = 0.005
+
+PROFILER_MAX_SECONDS = 30
+
+# Доля запросов, которые профилирует ProfilerMiddleware
+PROFILER_SAMPLE_RATE = 0
+
+# Журнал медленных запросов (core.slow_queries), None — выключен
+
+SLOW_QUERY_THRESHOLD = 100
+
+SLOW_QUERY_LOG_SIZE = 200
+
+# Трассировка запросов (core.tracing)
+
+TRACING_SAMPLE_RATE = 0
+
+TRACING_SERVICE_NAME = 'yatube'
+
+# 'file' или 'otlp'
+TRACING_EXPORTER = 'file'
+
+# Вне дерева исходников, чтобы трассы не попали в репозиторий.
+TRACING_FILE = os.path.join(
+    tempfile.gettempdir(), 'yatube_traces.ndjson'
+)
+
+TRACING_ENDPOINT = 'http://localhost:4318/v1/traces'
+
+THUMBNAIL_BACKEND = 'core.thumbnail.TracedThumbnailBackend'
+
+# Бюджет времени запуска воркера с yatube.settings.prod, секунды.
+# По умолчанию с большим запасом: тест ловит тяжёлые импорты, а не
+# загрузку машины. На стенде для замеров его ужесточают переменной
+# окружения STARTUP_TIME_BUDGET.
+
+STARTUP_TIME_BUDGET = float(os.environ.get('STARTUP_TIME_BUDGET', 10))
@@ -0,0 +1,19 @@
+"""Разработка: отладка, debug_toolbar и Server-Timing."""
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+SERVER_TIMING = True
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+# Перед TracingMiddleware, которая должна быть последней.
+MIDDLEWARE = MIDDLEWARE[:-1] + [
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    MIDDLEWARE[-1],
+]
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
@@ -0,0 +1,88 @@
+"""Боевые воркеры: без отладки, с кэшем шаблонов и постоянными соединениями.
+
+Обязательна переменная окружения SECRET_KEY. Остальное по желанию:
+    ALLOWED_HOSTS — хосты через запятую;
+    DB_ENGINE, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT — база
+    вместо SQLite;
+    CONN_MAX_AGE — сколько секунд держать соединение, по умолчанию 60;
+    MEMCACHED_LOCATION — адреса Memcached через запятую для общего
+    кэша и версий, иначе файловый кэш в CACHE_DIR;
+    STATIC_ROOT — куда collectstatic собирает статику;
+    TRACING_SAMPLE_RATE — доля трассируемых запросов.
+"""
+import copy
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, BASE_DIR, CACHES, DATABASES, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+if os.environ.get('ALLOWED_HOSTS'):
+    ALLOWED_HOSTS = os.environ['ALLOWED_HOSTS'].split(',')
+else:
+    ALLOWED_HOSTS = list(ALLOWED_HOSTS)
+
+# Скомпилированные шаблоны живут всё время работы воркера.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+DATABASES = copy.deepcopy(DATABASES)
+if os.environ.get('DB_ENGINE'):
+    DATABASES['default'] = {
+        'ENGINE': os.environ['DB_ENGINE'],
+        'NAME': os.environ.get('DB_NAME', ''),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+    }
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.environ.get('CONN_MAX_AGE', 60)
+)
+
+# Общий уровень кэша и версии должны быть одни на все воркеры и машины.
+# В Memcached incr атомарен; файловый кэш подходит только для одной
+# машины: там incr — это чтение и запись файла.
+CACHES = copy.deepcopy(CACHES)
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+    }
+    CACHES['versions'] = dict(CACHES['shared'], TIMEOUT=None)
+else:
+    CACHE_DIR = os.environ.get('CACHE_DIR', '/var/tmp/yatube_cache')
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+    CACHES['versions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'versions'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000000,
+        },
+    }
+
+STATIC_ROOT = os.environ.get(
+    'STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles')
+)
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+SERVER_TIMING = False
+
+TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', 0))
@@ -19,24 +19,31 @@ from django.views.static import serve
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import slow_query_log
+
 urlpatterns = [
     # импорт правил из приложения posts
     path('', include('posts.urls')),
+    path('admin/slow-queries/', slow_query_log, name='slow_query_log'),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
+    path('jobs/', include('jobs.urls', namespace='jobs')),
+    path('core/', include('core.urls', namespace='core')),
 ]
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
 handler500 = 'core.views.server_error'
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
+if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
 
@@ -3,6 +3,8 @@ WSGI config for yatube project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+Боевые воркеры запускаются с DJANGO_ENV=prod, см. yatube/settings/.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 """